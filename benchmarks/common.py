@@ -0,0 +1,54 @@
+"""Fixtures and parse functions shared by the offline benchmarks."""
+
+import hashlib
+import importlib
+import json
+import sys
+from pathlib import Path
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+FIXTURES_DIR = BENCHMARKS_DIR / "fixtures"
+# Written by record_fixtures.py: fixture name -> {"url", "recorded_at", "sha256"} of the captured page
+MANIFEST_NAME = "manifest.json"
+sys.path.insert(0, str(BENCHMARKS_DIR.parent / "feed_generators"))
+
+# Fixture file pattern -> (generator module, parse function)
+PARSERS = {
+    "anthropic_news.html": ("anthropic_news_blog", "parse_news_html"),
+    "anthropic_engineering.html": ("anthropic_eng_blog", "parse_engineering_html"),
+    "anthropic_research.html": ("anthropic_research_blog", "parse_research_html"),
+    "openai_research.html": ("openai_research_blog", "parse_openai_news_html"),
+    "ollama.html": ("ollama_blog", "parse_blog_html"),
+    "paulgraham_index.html": ("paulgraham_blog", "extract_essay_links"),
+    "paulgraham_essay_*.html": ("paulgraham_blog", "get_article_content"),
+    "claude_code_changelog.md": ("anthropic_changelog_claude_code", "parse_changelog_markdown"),
+}
+
+
+def load_parser(module_name, function_name):
+    """Import a generator module and return its parse function, without cache side effects."""
+    module = importlib.import_module(module_name)
+    if module_name == "anthropic_eng_blog":
+        # parse_engineering_html reads and writes the article cache; keep the benchmark read-only
+        module.load_article_cache = lambda: {}
+        module.save_article_cache = lambda cache: None
+    return getattr(module, function_name)
+
+
+def iter_fixtures(fixtures_dir=FIXTURES_DIR):
+    """Yield (fixture path, parse function) for every fixture that has a parser."""
+    for pattern, (module_name, function_name) in PARSERS.items():
+        func = load_parser(module_name, function_name)
+        for fixture in sorted(fixtures_dir.glob(pattern)):
+            yield fixture, func
+
+
+def fixture_provenance(fixture):
+    """Return the manifest entry of a fixture if it is an unmodified recorded page, otherwise None."""
+    manifest_file = fixture.parent / MANIFEST_NAME
+    if not manifest_file.exists():
+        return None
+    entry = json.loads(manifest_file.read_text()).get(fixture.name)
+    if entry and entry["sha256"] == hashlib.sha256(fixture.read_bytes()).hexdigest():
+        return entry
+    return None
@@ -0,0 +1,92 @@
+"""Micro-benchmark utils.dates against the date parsing it replaced.
+
+Times, per call, the old strptime loop (one format after another, each miss raising a
+ValueError) against utils.dates.parse_date with a cold and a warm memo, and the old
+twelve-regexes-per-essay month search against utils.dates.find_month_year on the recorded
+Paul Graham essays. Prints a table; there is nothing to compare against a baseline.
+
+Usage: python benchmarks/date_parsing.py [--number N]
+"""
+
+import argparse
+import re
+import sys
+import timeit
+from datetime import datetime, timezone
+
+from common import FIXTURES_DIR
+
+from utils.dates import MONTH_NAMES, find_month_year, parse_date
+from utils.parsing import make_soup
+
+# One date per supported format, so the strptime loop pays for its misses as it does on real pages
+SAMPLE_DATES = ["Mar 27, 2025", "March 27, 2025", "2025-03-27", "03/27/2025", "27 Mar 2025", "27 March 2025"]
+STRPTIME_FORMATS = ["%b %d, %Y", "%B %d, %Y", "%Y-%m-%d", "%m/%d/%Y", "%d %b %Y", "%d %B %Y"]
+
+
+def strptime_loop(date_str):
+    """The previous anthropic_research_blog.parse_date_string."""
+    date_str = date_str.strip()
+    for date_format in STRPTIME_FORMATS:
+        try:
+            return datetime.strptime(date_str, date_format).replace(tzinfo=timezone.utc)
+        except ValueError:
+            continue
+    return None
+
+
+def month_regex_loop(text):
+    """The previous paulgraham_blog.extract_date_from_text."""
+    for month in MONTH_NAMES:
+        match = re.search(f"{month}\\s+\\d{{4}}", text)
+        if match:
+            return datetime.strptime(f"{match.group(0)} 1", "%B %Y %d").replace(tzinfo=timezone.utc)
+    return None
+
+
+def parse_date_cold(date_str):
+    parse_date.cache_clear()
+    return parse_date(date_str)
+
+
+def per_call_us(func, inputs, number):
+    """Return the best time per call of func over inputs, in microseconds."""
+    runs = timeit.repeat(lambda: [func(value) for value in inputs], number=number, repeat=5)
+    return min(runs) / number / len(inputs) * 1e6
+
+
+def essay_texts():
+    """Return the main text blocks of the recorded essays, as paulgraham_blog searches them."""
+    texts = []
+    for fixture in sorted(FIXTURES_DIR.glob("paulgraham_essay_*.html")):
+        fonts = make_soup(fixture.read_text(encoding="utf-8")).find_all("font", size="2")
+        texts.extend(font.get_text().strip() for font in fonts if len(font.get_text().strip()) > 100)
+    return texts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=2000, help="Calls per timing run (default: 2000)")
+    args = parser.parse_args()
+
+    for value in SAMPLE_DATES:
+        if parse_date(value) != strptime_loop(value):
+            print(f"parse_date and the strptime loop disagree on {value!r}")
+            return 1
+
+    texts = essay_texts()
+    rows = [
+        ("strptime loop (6 formats)", per_call_us(strptime_loop, SAMPLE_DATES, args.number)),
+        ("parse_date, cold memo", per_call_us(parse_date_cold, SAMPLE_DATES, args.number)),
+        ("parse_date, warm memo", per_call_us(parse_date, SAMPLE_DATES, args.number)),
+        (f"month regex loop ({len(texts)} essays)", per_call_us(month_regex_loop, texts, args.number // 10)),
+        (f"find_month_year ({len(texts)} essays)", per_call_us(find_month_year, texts, args.number // 10)),
+    ]
+    print(f"{'approach':<32} {'per call':>10}")
+    for name, micros in rows:
+        print(f"{name:<32} {micros:>8.2f}us")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+"""Check the import time of every generator module against its budget.
+
+Imports each module in a fresh interpreter under `python -X importtime` and keeps the best
+cumulative time of N runs, then compares it against benchmarks/import_budgets.json. Exits
+non-zero if a module is over budget, or if importing it loads one of HEAVY_MODULES: those
+(the browser driver, bs4, feedgen, ...) must only be imported on the code paths that use them.
+
+Usage: python benchmarks/import_times.py [--repeat N] [--update-budgets] [--headroom F]
+"""
+
+import argparse
+import json
+import math
+import subprocess
+import sys
+from pathlib import Path
+
+from common import BENCHMARKS_DIR
+
+FEED_GENERATORS_DIR = BENCHMARKS_DIR.parent / "feed_generators"
+BUDGETS_FILE = BENCHMARKS_DIR / "import_budgets.json"
+# Smallest budget --update-budgets writes: a few ms of scheduler jitter would fail a 10ms budget
+MIN_BUDGET_MS = 20
+
+# Packages no module may load at import time
+HEAVY_MODULES = {
+    "undetected_chromedriver",
+    "selenium",
+    "trio",
+    "websockets",
+    "requests",
+    "urllib3",
+    "bs4",
+    "feedgen",
+    "lxml",
+    "pytz",
+    "sqlite3",
+}
+
+
+def discover_modules():
+    """Return the generator scripts, the runner and the utils modules, as importable names."""
+    modules = [path.stem for path in sorted(FEED_GENERATORS_DIR.glob("*.py"))]
+    modules += [f"utils.{path.stem}" for path in sorted((FEED_GENERATORS_DIR / "utils").glob("*.py"))]
+    return [module for module in modules if module != "utils.__init__"]
+
+
+def import_profile(module):
+    """Import `module` in a fresh interpreter; return (its cumulative import time in ms, modules loaded)."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=FEED_GENERATORS_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr}")
+
+    # Lines look like "import time: self [us] | cumulative | imported package", children first
+    cumulative_us, loaded = None, set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        name = name.strip()
+        loaded.add(name.split(".")[0])
+        if name == module:
+            cumulative_us = int(cumulative)
+    return cumulative_us / 1000, loaded
+
+
+def measure(modules, repeat):
+    """Return {module: {"import_ms": best time, "heavy": heavy modules it loads}}."""
+    results = {}
+    for module in modules:
+        times, heavy = [], set()
+        for _ in range(repeat):
+            import_ms, loaded = import_profile(module)
+            times.append(import_ms)
+            heavy |= loaded & HEAVY_MODULES
+        results[module] = {"import_ms": round(min(times), 1), "heavy": sorted(heavy)}
+    return results
+
+
+def compare(results, budgets):
+    """Print each module's import time against its budget and return the list of violations."""
+    violations = []
+    print(f"{'module':<36} {'import':>9} {'budget':>9}  heavy imports")
+    for module, result in results.items():
+        budget = budgets.get(module)
+        budget_text = "-" if budget is None else f"{budget:.0f}ms"
+        print(f"{module:<36} {result['import_ms']:>7.1f}ms {budget_text:>9}  {', '.join(result['heavy']) or '-'}")
+        if result["heavy"]:
+            violations.append(f"{module}: imports {', '.join(result['heavy'])} at import time")
+        if budget is not None and result["import_ms"] > budget:
+            violations.append(f"{module}: {result['import_ms']:.1f}ms, budget is {budget:.0f}ms")
+    return violations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budgets", type=Path, default=BUDGETS_FILE, help="Budgets JSON file")
+    parser.add_argument("--repeat", type=int, default=5, help="Imports per module (best is kept)")
+    parser.add_argument("--update-budgets", action="store_true", help="Store this run, plus headroom, as the budgets")
+    parser.add_argument(
+        "--headroom", type=float, default=1.0, help="Budget above the measured time with --update-budgets (1.0 = 2x)"
+    )
+    args = parser.parse_args()
+
+    results = measure(discover_modules(), args.repeat)
+
+    if args.update_budgets:
+        # Rounded up to 10ms, so a budget isn't tighter than the noise between machines
+        budgets = {
+            module: max(MIN_BUDGET_MS, math.ceil(r["import_ms"] * (1 + args.headroom) / 10) * 10)
+            for module, r in results.items()
+        }
+        args.budgets.write_text(json.dumps(budgets, indent=2, sort_keys=True) + "\n")
+        print(f"Wrote import budgets for {len(budgets)} modules to {args.budgets}")
+        return 0
+
+    budgets = json.loads(args.budgets.read_text()) if args.budgets.exists() else {}
+    violations = compare(results, budgets)
+    if violations:
+        print("\nOver budget:")
+        for violation in violations:
+            print(f"  {violation}")
+        return 1
+    print("\nAll imports within budget")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""Compare the parsers on full html.parser trees against lxml partial trees.
+
+Runs every parse function over its HTML fixture twice: once as the generators used to parse
+(html.parser, whole document) and once as they parse now (lxml, SoupStrainer where the module
+declares one). Reports the best-of-N parse time, the tracemalloc peak and whether both runs
+produced the same result.
+
+Usage: python benchmarks/parse_backends.py [--fixtures DIR] [--repeat N]
+"""
+
+import argparse
+import gc
+import logging
+import sys
+import timeit
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+
+from common import FIXTURES_DIR, fixture_provenance, iter_fixtures
+from utils import parsing
+
+
+def full_tree_soup(markup, only=None):
+    """make_soup as the generators used to parse: html.parser, whole document, strainer ignored."""
+    return parsing.make_soup(markup, parser="html.parser")
+
+
+@contextmanager
+def full_tree_parsing():
+    """Make the loaded generator modules parse with full_tree_soup for the duration of the block."""
+    modules = [
+        module
+        for module in list(sys.modules.values())
+        if module is not parsing and getattr(module, "make_soup", None) is parsing.make_soup
+    ]
+    for module in modules:
+        module.make_soup = full_tree_soup
+    try:
+        yield
+    finally:
+        for module in modules:
+            module.make_soup = parsing.make_soup
+
+
+def measure(func, html_content, repeat):
+    """Return (result, best time in seconds, peak traced memory in bytes) of func(html_content)."""
+    best = min(timeit.repeat(lambda: func(html_content), number=1, repeat=repeat))
+    # Collected first, so the peak doesn't depend on when garbage from the timing runs is freed
+    gc.collect()
+    tracemalloc.start()
+    result = func(html_content)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, best, peak
+
+
+def run(fixtures_dir, repeat):
+    print(
+        f"{'fixture':<28} {'html.parser':>12} {'lxml':>10} {'speedup':>8} {'peak before':>12} {'peak after':>11}  same"
+    )
+    for fixture, func in iter_fixtures(fixtures_dir):
+        if fixture.suffix != ".html":
+            continue
+        html_content = fixture.read_text(encoding="utf-8")
+
+        with full_tree_parsing():
+            before, before_time, before_peak = measure(func, html_content, repeat)
+        after, after_time, after_peak = measure(func, html_content, repeat)
+
+        print(
+            f"{fixture.name:<28} {before_time * 1000:>10.2f}ms {after_time * 1000:>8.2f}ms "
+            f"{before_time / after_time:>7.1f}x {before_peak / 1024:>10.0f}KiB {after_peak / 1024:>9.0f}KiB  "
+            f"{'yes' if before == after else 'NO'}"
+            f"{'' if fixture_provenance(fixture) else '  (not a recorded page)'}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fixtures", type=Path, default=FIXTURES_DIR, help="HTML fixtures directory")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing runs per parser (best is reported)")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    run(args.fixtures, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
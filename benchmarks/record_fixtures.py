@@ -0,0 +1,116 @@
+"""Record fresh snapshots of every source page into the benchmark fixtures.
+
+The only benchmark script that needs the network: it fetches each page the generators parse
+(the browser-rendered ones through the shared Chrome), plus the first few essays linked from
+the Paul Graham index, and overwrites the matching fixture. Re-record the baselines afterwards.
+
+Usage: python benchmarks/record_fixtures.py [--fixtures DIR] [--essays N] [--only NAME ...]
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+from common import FIXTURES_DIR, MANIFEST_NAME
+
+import anthropic_changelog_claude_code
+import anthropic_eng_blog
+import anthropic_news_blog
+import anthropic_research_blog
+import ollama_blog
+import openai_research_blog
+import paulgraham_blog
+from utils.browser import shutdown_browser_pool
+from utils.fetch import fetch
+
+logger = logging.getLogger(__name__)
+
+
+def fetch_text(url):
+    # Plain GET: the generators' conditional fetches would return nothing for unchanged pages
+    return fetch(url, source="fixtures").text
+
+
+# Fixture name -> (page URL, function returning the page content)
+SOURCES = {
+    "anthropic_news.html": (anthropic_news_blog.NEWS_URL, lambda: fetch_text(anthropic_news_blog.NEWS_URL)),
+    "anthropic_engineering.html": (
+        anthropic_eng_blog.ENGINEERING_URL,
+        lambda: fetch_text(anthropic_eng_blog.ENGINEERING_URL),
+    ),
+    "anthropic_research.html": (
+        anthropic_research_blog.RESEARCH_URL,
+        anthropic_research_blog.fetch_research_content_selenium,
+    ),
+    "openai_research.html": (
+        openai_research_blog.NEWS_URL,
+        lambda: openai_research_blog.fetch_news_content_selenium(openai_research_blog.NEWS_URL),
+    ),
+    "ollama.html": (ollama_blog.BLOG_URL, lambda: fetch_text(ollama_blog.BLOG_URL)),
+    "paulgraham_index.html": (paulgraham_blog.ESSAYS_URL, lambda: fetch_text(paulgraham_blog.ESSAYS_URL)),
+    "claude_code_changelog.md": (
+        anthropic_changelog_claude_code.CHANGELOG_URL,
+        lambda: fetch_text(anthropic_changelog_claude_code.CHANGELOG_URL),
+    ),
+}
+
+
+def write_fixture(fixtures_dir, manifest, name, url, content):
+    """Write a fixture and record where and when it was captured in the manifest."""
+    data = content.encode("utf-8")
+    (fixtures_dir / name).write_bytes(data)
+    manifest[name] = {
+        "url": url,
+        "recorded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "sha256": hashlib.sha256(data).hexdigest(),
+    }
+
+
+def record(fixtures_dir, names, essays):
+    """Fetch the named sources into fixtures_dir, updating its manifest, and return how many failed."""
+    manifest_file = fixtures_dir / MANIFEST_NAME
+    manifest = json.loads(manifest_file.read_text()) if manifest_file.exists() else {}
+    failures = 0
+    for name in names:
+        url, fetch_content = SOURCES[name]
+        try:
+            content = fetch_content()
+            write_fixture(fixtures_dir, manifest, name, url, content)
+            logger.info(f"Recorded {name} ({len(content)} characters)")
+        except Exception as e:
+            logger.error(f"Failed to record {name}: {str(e)}")
+            failures += 1
+            continue
+
+        if name == "paulgraham_index.html":
+            for k, (_, url) in enumerate(paulgraham_blog.extract_essay_links(content)[:essays]):
+                try:
+                    write_fixture(fixtures_dir, manifest, f"paulgraham_essay_{k}.html", url, fetch_text(url))
+                    logger.info(f"Recorded paulgraham_essay_{k}.html from {url}")
+                except Exception as e:
+                    logger.error(f"Failed to record essay {url}: {str(e)}")
+                    failures += 1
+    manifest_file.write_text(json.dumps(manifest, indent=2, sort_keys=True) + "\n")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fixtures", type=Path, default=FIXTURES_DIR, help="Fixtures directory")
+    parser.add_argument("--essays", type=int, default=3, help="Paul Graham essays to record (default: 3)")
+    parser.add_argument("--only", nargs="+", choices=sorted(SOURCES), help="Record only these fixtures")
+    args = parser.parse_args()
+
+    try:
+        failures = record(args.fixtures, args.only or list(SOURCES), args.essays)
+    finally:
+        shutdown_browser_pool()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
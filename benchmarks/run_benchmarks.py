@@ -0,0 +1,184 @@
+"""Benchmark every parse function over the recorded fixtures and check for regressions.
+
+Times each parser, measures its tracemalloc peak and counts the items it returns, then compares
+the numbers against benchmarks/baselines.json. Exits non-zero if a parser got slower or hungrier
+than the tolerance allows, or returns a different item count.
+
+Times are stored in calibration units (multiples of a fixed pure-Python workload timed on the
+same machine), so baselines recorded on one machine stay meaningful on another. Each sample
+times the parser between two timings of the workload, each over enough calls to last at least
+MIN_SAMPLE_SECONDS, and the median ratio of N samples is kept: a single call of a few ms is
+mostly scheduler noise, and load that slows both halves of a sample cancels out. The network
+is disabled for the whole run, so the suite is fully offline.
+
+Usage: python benchmarks/run_benchmarks.py [--repeat N] [--time-tolerance F] [--memory-tolerance F]
+                                           [--update-baselines]
+"""
+
+import argparse
+import functools
+import gc
+import json
+import logging
+import socket
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+from common import BENCHMARKS_DIR, FIXTURES_DIR, fixture_provenance, iter_fixtures
+
+BASELINES_FILE = BENCHMARKS_DIR / "baselines.json"
+# Shortest timing sample: fast parsers are called as many times as it takes
+MIN_SAMPLE_SECONDS = 0.02
+
+
+def block_network():
+    """Make any attempt to open a connection fail, so a parser can't silently go online."""
+
+    def refuse(*args, **kwargs):
+        raise RuntimeError("Network access is disabled while benchmarking")
+
+    socket.socket.connect = refuse
+    socket.create_connection = refuse
+
+
+def calibration_workload():
+    """A fixed pure-Python workload, whose time is the unit benchmark times are stored in."""
+    return sorted(str(i * 7919 % 10007) for i in range(20000))
+
+
+def time_per_call(func, number):
+    """Return the mean time in seconds of `number` back-to-back calls of func."""
+    start = time.perf_counter()
+    for _ in range(number):
+        func()
+    return (time.perf_counter() - start) / number
+
+
+def calls_per_sample(func):
+    """Return how many calls of func a timing sample needs to last MIN_SAMPLE_SECONDS."""
+    number = 1
+    while time_per_call(func, number) * number < MIN_SAMPLE_SECONDS:
+        number *= 2
+    return number
+
+
+def count_items(result):
+    """Return the number of items a parse function produced."""
+    if isinstance(result, list):
+        return len(result)
+    # get_article_content returns (content, date) for a single essay
+    return int(bool(result and result[0]))
+
+
+def measure(func, content, repeat):
+    """Return (time in calibration units, time in seconds, peak traced memory in bytes, item count) of func(content).
+
+    Both times are the medians of `repeat` samples, each timing the parser between two timings
+    of the calibration workload, so machine load drifting during the run cancels out.
+    """
+    parse = functools.partial(func, content)
+    parse_calls, unit_calls = calls_per_sample(parse), calls_per_sample(calibration_workload)
+    ratios, seconds = [], []
+    for _ in range(repeat):
+        unit = time_per_call(calibration_workload, unit_calls)
+        sample = time_per_call(parse, parse_calls)
+        unit = min(unit, time_per_call(calibration_workload, unit_calls))
+        ratios.append(sample / unit)
+        seconds.append(sample)
+    # Start from an empty collector, so when garbage from earlier runs is freed doesn't move the peak
+    gc.collect()
+    tracemalloc.start()
+    result = func(content)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(ratios), statistics.median(seconds), peak, count_items(result)
+
+
+def run(fixtures_dir, repeat):
+    """Benchmark every fixture and return the results, keyed by fixture name."""
+    results = {}
+    for fixture, func in iter_fixtures(fixtures_dir):
+        content = fixture.read_text(encoding="utf-8")
+        units, seconds, peak, items = measure(func, content, repeat)
+        results[fixture.name] = {
+            "parser": f"{func.__module__}.{func.__name__}",
+            "time_units": round(units, 3),
+            "time_ms": round(seconds * 1000, 3),
+            "peak_kib": round(peak / 1024, 1),
+            "items": items,
+            # Whether the fixture is an unmodified page captured by record_fixtures.py
+            "recorded": fixture_provenance(fixture) is not None,
+        }
+    return results
+
+
+def compare(results, baselines, time_tolerance, memory_tolerance):
+    """Print each result against its baseline and return the list of regressions."""
+    regressions = []
+    print(f"{'fixture':<28} {'time':>9} {'baseline':>9} {'peak':>10} {'baseline':>10} {'items':>6}")
+    for name, result in results.items():
+        baseline = baselines.get(name)
+        if baseline is None:
+            print(
+                f"{name:<28} {result['time_ms']:>7.2f}ms {'-':>9} {result['peak_kib']:>7.0f}KiB {'-':>10} "
+                f"{result['items']:>6}"
+            )
+            continue
+
+        time_ratio = result["time_units"] / baseline["time_units"]
+        memory_ratio = result["peak_kib"] / baseline["peak_kib"] if baseline["peak_kib"] else 1.0
+        print(
+            f"{name:<28} {result['time_ms']:>7.2f}ms {time_ratio:>8.2f}x {result['peak_kib']:>7.0f}KiB "
+            f"{memory_ratio:>9.2f}x {result['items']:>6}"
+        )
+        if time_ratio > 1 + time_tolerance:
+            regressions.append(f"{name}: {time_ratio:.2f}x the baseline time")
+        if memory_ratio > 1 + memory_tolerance:
+            regressions.append(f"{name}: {memory_ratio:.2f}x the baseline peak memory")
+        if result["items"] != baseline["items"]:
+            regressions.append(f"{name}: {result['items']} items, baseline has {baseline['items']}")
+
+    for name in baselines.keys() - results.keys():
+        regressions.append(f"{name}: fixture missing")
+
+    synthetic = sorted(name for name, result in results.items() if not result["recorded"])
+    if synthetic:
+        print(f"\nNot recorded pages (see fixtures/README.md), so not representative: {', '.join(synthetic)}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fixtures", type=Path, default=FIXTURES_DIR, help="Fixtures directory")
+    parser.add_argument("--baselines", type=Path, default=BASELINES_FILE, help="Baselines JSON file")
+    parser.add_argument("--repeat", type=int, default=10, help="Timing samples per parser (median is kept)")
+    parser.add_argument("--time-tolerance", type=float, default=0.5, help="Allowed slowdown (default: 0.5 = 50%%)")
+    parser.add_argument("--memory-tolerance", type=float, default=0.1, help="Allowed peak growth (default: 0.1)")
+    parser.add_argument("--update-baselines", action="store_true", help="Store this run as the new baselines")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    block_network()
+    results = run(args.fixtures, args.repeat)
+
+    if args.update_baselines:
+        args.baselines.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+        print(f"Wrote baselines for {len(results)} fixtures to {args.baselines}")
+        return 0
+
+    baselines = json.loads(args.baselines.read_text()) if args.baselines.exists() else {}
+    regressions = compare(results, baselines, args.time_tolerance, args.memory_tolerance)
+    if regressions:
+        print("\nRegressions:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    print("\nNo regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""Load test the feed server the way polling feed readers use it.
+
+Starts serve_feeds on a free local port (or targets --url), then runs --clients concurrent
+readers, each on its own keep-alive connection, for --duration seconds. Each reader polls the
+feeds in turn with Accept-Encoding: br, gzip and, once it has seen a feed, If-None-Match, so
+most polls are answered 304. Prints requests per second, latency percentiles and the response
+statuses; there is nothing to compare against a baseline.
+
+Usage: python benchmarks/serve_load.py [--directory DIR] [--clients N] [--duration S] [--url URL]
+"""
+
+import argparse
+import http.client
+import statistics
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import common  # noqa: F401  (puts feed_generators on sys.path)
+
+from serve_feeds import is_feed_name, make_server
+from utils.store import FEEDS_DIR
+
+
+def reader(host, port, names, deadline, latencies, statuses, lock):
+    """Poll the feeds on one connection until the deadline, recording latencies and statuses."""
+    conn = http.client.HTTPConnection(host, port, timeout=10)
+    etags, local_latencies, local_statuses = {}, [], Counter()
+    index = 0
+    while time.perf_counter() < deadline:
+        name = names[index % len(names)]
+        index += 1
+        headers = {"Accept-Encoding": "br, gzip"}
+        if name in etags:
+            headers["If-None-Match"] = etags[name]
+        start = time.perf_counter()
+        conn.request("GET", f"/{name}", headers=headers)
+        response = conn.getresponse()
+        response.read()
+        local_latencies.append(time.perf_counter() - start)
+        local_statuses[response.status] += 1
+        if response.getheader("ETag"):
+            etags[name] = response.getheader("ETag")
+    conn.close()
+    with lock:
+        latencies.extend(local_latencies)
+        statuses.update(local_statuses)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--directory", default=str(FEEDS_DIR), help="Feeds directory to serve (default: feeds/)")
+    parser.add_argument("--url", help="Load test a running server instead, e.g. http://127.0.0.1:8000")
+    parser.add_argument("--clients", type=int, default=50, help="Concurrent readers (default: 50)")
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds to run (default: 5)")
+    args = parser.parse_args()
+
+    names = sorted(path.name for path in Path(args.directory).iterdir() if is_feed_name(path.name))
+    if not names:
+        print(f"No feeds to serve in {args.directory}")
+        return 1
+
+    server = None
+    if args.url:
+        host, port = urlsplit(args.url).hostname, urlsplit(args.url).port or 80
+    else:
+        # In this process, so readers and server share the GIL: a lower bound for a standalone server
+        server = make_server(args.directory, port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        host, port = server.server_address
+
+    latencies, statuses, lock = [], Counter(), threading.Lock()
+    deadline = time.perf_counter() + args.duration
+    threads = [
+        threading.Thread(target=reader, args=(host, port, names, deadline, latencies, statuses, lock))
+        for _ in range(args.clients)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    if server:
+        server.shutdown()
+        server.server_close()
+
+    latencies.sort()
+    print(f"{len(names)} feeds, {args.clients} readers, {elapsed:.1f}s")
+    print(f"requests:  {len(latencies)} ({len(latencies) / elapsed:.0f}/s)")
+    p50, p99 = statistics.median(latencies), latencies[int(len(latencies) * 0.99)]
+    print(f"latency:   p50 {p50 * 1000:.2f}ms, p99 {p99 * 1000:.2f}ms")
+    print(f"statuses:  {', '.join(f'{status}: {n}' for status, n in sorted(statuses.items()))}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
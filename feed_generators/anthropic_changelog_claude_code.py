@@ -1,46 +1,104 @@
-import requests
-from datetime import datetime, timedelta
-import pytz
-from feedgen.feed import FeedGenerator
+from contextlib import closing
+from datetime import datetime, timedelta, timezone
+import hashlib
 import logging
-from pathlib import Path
+from utils.fetch import FetchError, finish_stream
+from utils.http_cache import conditional_get
+from utils import store
+from utils.sources import FeedSource, register
 import re
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
 
 
-def get_project_root():
-    return Path(__file__).parent.parent
+# Names the source in the store
+SOURCE = "anthropic_changelog_claude_code"
+CHANGELOG_URL = "https://raw.githubusercontent.com/anthropics/claude-code/main/CHANGELOG.md"
+# Versions the feed carries; the changelog is only read as far as the newest MAX_VERSIONS
+MAX_VERSIONS = 50
 
 
-def ensure_feeds_directory():
-    feeds_dir = get_project_root() / "feeds"
-    feeds_dir.mkdir(exist_ok=True)
-    return feeds_dir
+def load_first_seen():
+    """Load the first-seen times of the versions from the store, keyed by version."""
+    try:
+        return {version: seen for version, (_, seen) in store.load_first_seen(SOURCE).items()}
+    except Exception as e:
+        logger.warning(f"Failed to load changelog first-seen times: {e}")
+    return {}
+
+
+def save_first_seen(first_seen):
+    """Record the first-seen times of newly seen versions in the store."""
+    try:
+        store.record_first_seen(SOURCE, {version: (None, seen) for version, seen in first_seen.items()})
+    except Exception as e:
+        logger.warning(f"Failed to save changelog first-seen times: {e}")
+
+
+def version_guid(item):
+    """Return a GUID derived from a version's title and notes, so it only changes when they do."""
+    digest = hashlib.sha256(f"{item['title']}\n{item['description']}".encode("utf-8")).hexdigest()[:16]
+    return f"{item['link']}#{digest}"
+
 
+def iter_response_lines(response, source=SOURCE):
+    """Yield the lines of a streamed response, closing it once the caller stops reading."""
+    try:
+        # raw.githubusercontent.com sends charset=utf-8, but iter_lines needs an encoding to decode
+        response.encoding = response.encoding or "utf-8"
+        yield from response.iter_lines(chunk_size=8192, decode_unicode=True)
+    finally:
+        finish_stream(response, source=source)
+
+
+def fetch_changelog_lines(url=CHANGELOG_URL, source=SOURCE):
+    """Stream the changelog line by line, or return None if it has not changed since the last run.
 
-def fetch_changelog_content(url="https://raw.githubusercontent.com/anthropics/claude-code/main/CHANGELOG.md"):
+    Only the response headers are read here; the body is read as the returned generator is
+    consumed, and closing the generator closes the connection.
+    """
     try:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        }
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        return response.text
-    except requests.RequestException as e:
+        response = conditional_get(url, source=source, stream=True)
+        return iter_response_lines(response, source) if response is not None else None
+    except FetchError as e:
         logger.error(f"Error fetching changelog content: {str(e)}")
         raise
 
 
-def parse_changelog_markdown(markdown_content):
+def changelog_item(version, changes, date):
+    """Build the feed item of one version."""
+    version_anchor = version.replace('.', '')
+    # Create HTML list for description
+    description_html = '<ul>' + ''.join(f'<li>{change}</li>' for change in changes) + '</ul>'
+    return {
+        "title": f"v{version}",
+        "link": f"https://github.com/anthropics/claude-code/blob/main/CHANGELOG.md#{version_anchor}",
+        "description": description_html,
+        "date": date,
+        "category": "Changelog",
+    }
+
+
+def parse_changelog_markdown(markdown_content, first_seen=None, max_versions=None):
+    """Parse the changelog into one item per version, dated when the version was first seen.
+
+    `markdown_content` is the whole file or an iterable of its lines, such as a streamed response.
+    The changelog lists the newest versions first, so with `max_versions` reading stops as soon
+    as that many versions are complete, and the rest of the file is never read.
+
+    `first_seen` maps versions to first-seen times; versions missing from it are added, seen now.
+    Several new versions in one run are staggered a second apart, newest first, to keep their order.
+    """
     try:
         items = []
-        lines = markdown_content.split('\n')
+        lines = markdown_content.split('\n') if isinstance(markdown_content, str) else markdown_content
         current_version = None
         current_changes = []
         version_count = 0
-        base_date = datetime.now(pytz.UTC)
+        first_seen = {} if first_seen is None else first_seen
+        now = datetime.now(timezone.utc).replace(microsecond=0)
+        new_versions = 0
         
         for line in lines:
             line = line.strip()
@@ -49,21 +107,18 @@ def parse_changelog_markdown(markdown_content):
             if line.startswith('## ') and re.match(r'## \d+\.\d+\.\d+', line):
                 # Save previous version if exists
                 if current_version and current_changes:
-                    version_anchor = current_version.replace('.', '')
-                    # Create HTML list for description
-                    description_html = '<ul>' + ''.join(f'<li>{change}</li>' for change in current_changes) + '</ul>'
-                    items.append({
-                        "title": f"v{current_version}",
-                        "link": f"https://github.com/anthropics/claude-code/blob/main/CHANGELOG.md#{version_anchor}",
-                        "description": description_html,
-                        "date": current_date,
-                        "category": "Changelog",
-                    })
+                    items.append(changelog_item(current_version, current_changes, current_date))
+                current_version = None
+                if max_versions is not None and len(items) >= max_versions:
+                    break
                 
                 # Start new version
                 current_version = line[3:].strip()  # Remove "## "
                 current_changes = []
-                current_date = base_date - timedelta(days=version_count * 2)
+                if current_version not in first_seen:
+                    first_seen[current_version] = now - timedelta(seconds=new_versions)
+                    new_versions += 1
+                current_date = first_seen[current_version]
                 version_count += 1
                 continue
             
@@ -75,17 +130,11 @@ def parse_changelog_markdown(markdown_content):
         
         # Don't forget the last version
         if current_version and current_changes:
-            version_anchor = current_version.replace('.', '')
-            description_html = '<ul>' + ''.join(f'<li>{change}</li>' for change in current_changes) + '</ul>'
-            items.append({
-                "title": f"v{current_version}",
-                "link": f"https://github.com/anthropics/claude-code/blob/main/CHANGELOG.md#{version_anchor}",
-                "description": description_html,
-                "date": current_date,
-                "category": "Changelog",
-            })
-
-        logger.info(f"Successfully parsed {len(items)} changelog items from {version_count} versions")
+            items.append(changelog_item(current_version, current_changes, current_date))
+
+        logger.info(
+            f"Successfully parsed {len(items)} changelog items from {version_count} versions ({new_versions} new)"
+        )
         return items
 
     except Exception as e:
@@ -93,9 +142,33 @@ def parse_changelog_markdown(markdown_content):
         raise
 
 
-def generate_rss_feed(items, feed_name="anthropic_changelog_claude_code"):
-    try:
-        fg = FeedGenerator()
+@register
+class ClaudeCodeChangelogSource(FeedSource):
+    """The Claude Code CHANGELOG.md, one item per version."""
+
+    name = "anthropic_changelog_claude_code"
+    url = CHANGELOG_URL
+    sort_by_date = True
+    max_versions = MAX_VERSIONS
+    # Moves fast, and an unchanged changelog costs a conditional GET
+    interval = 15 * 60
+    # The changelog lists every version, so merging would only keep the ones max_versions drops
+    mergeable = False
+
+    def fetch(self):
+        return fetch_changelog_lines(self.url, source=self.name)
+
+    def parse(self, lines):
+        first_seen = load_first_seen()
+        known_versions = set(first_seen)
+        with closing(lines):
+            items = parse_changelog_markdown(lines, first_seen, self.max_versions)
+        new_versions = {version: seen for version, seen in first_seen.items() if version not in known_versions}
+        if new_versions:
+            save_first_seen(new_versions)
+        return items
+
+    def configure_feed(self, fg):
         fg.title("Claude Code Changelog")
         fg.description("Version updates and changes from Claude Code CHANGELOG.md")
         fg.link(href="https://github.com/anthropics/claude-code/blob/main/CHANGELOG.md")
@@ -105,58 +178,25 @@ def generate_rss_feed(items, feed_name="anthropic_changelog_claude_code"):
         fg.logo("https://www.anthropic.com/images/icons/apple-touch-icon.png")
         fg.subtitle("Claude Code Changelog")
         fg.link(href="https://github.com/anthropics/claude-code/blob/main/CHANGELOG.md", rel="alternate")
-        fg.link(href=f"https://anthropic.com/feed_{feed_name}.xml", rel="self")
-
-        items.sort(key=lambda x: x["date"], reverse=True)
-
-        for item in items:
-            fe = fg.add_entry()
-            fe.title(item["title"])
-            fe.description(item["description"])
-            fe.link(href=item["link"])
-            fe.published(item["date"])
-            fe.category(term=item["category"])
-            fe.id(f"{item['link']}#{hash(item['title'])}")
-
-        logger.info("Successfully generated RSS feed")
+        fg.link(href=f"https://anthropic.com/feed_{self.name}.xml", rel="self")
+
+    def generate_feed(self, entries):
+        fg = super().generate_feed(entries)
+        # Dated by the newest version rather than the run, so a run without new versions renders the same bytes
+        dates = [entry["published"] for entry in entries if entry["published"] is not None]
+        if dates:
+            fg.lastBuildDate(max(dates))
         return fg
 
-    except Exception as e:
-        logger.error(f"Error generating RSS feed: {str(e)}")
-        raise
-
-
-def save_rss_feed(feed_generator, feed_name="anthropic_changelog_claude_code"):
-    try:
-        feeds_dir = ensure_feeds_directory()
-        output_filename = feeds_dir / f"feed_{feed_name}.xml"
-        feed_generator.rss_file(str(output_filename), pretty=True)
-        logger.info(f"Successfully saved RSS feed to {output_filename}")
-        return output_filename
-    except Exception as e:
-        logger.error(f"Error saving RSS feed: {str(e)}")
-        raise
+    def entry(self, item):
+        return dict(super().entry(item), id=version_guid(item))
 
 
-def main(feed_name="anthropic_changelog_claude_code"):
-    try:
-        markdown_content = fetch_changelog_content()
-        items = parse_changelog_markdown(markdown_content)
-
-        if not items:
-            logger.warning("No changelog items found")
-            return False
-
-        feed = generate_rss_feed(items, feed_name)
-        output_file = save_rss_feed(feed, feed_name)
-
-        logger.info(f"Successfully generated RSS feed with {len(items)} items")
-        return True
-
-    except Exception as e:
-        logger.error(f"Failed to generate RSS feed: {str(e)}")
-        return False
+def main(feed_name="anthropic_changelog_claude_code", max_versions=MAX_VERSIONS):
+    source = ClaudeCodeChangelogSource(feed_name)
+    source.max_versions = max_versions
+    return source.run() != "failed"
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
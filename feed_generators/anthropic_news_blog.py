@@ -1,39 +1,28 @@
-import requests
-import xml.etree.ElementTree as ET
-from bs4 import BeautifulSoup
-from datetime import datetime
-import pytz
-from feedgen.feed import FeedGenerator
+from datetime import datetime, timezone
 import logging
-from pathlib import Path
+from utils.dates import parse_date
+from utils.fetch import FetchError
+from utils.http_cache import conditional_get
+from utils.parsing import Strainer, has_class, make_soup
+from utils.sources import FeedSource, register
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
 
+# Only the article cards are needed, so only they are built into the parse tree
+NEWS_CARD_STRAINER = Strainer("a", class_=has_class("PostCard_post-card__z_Sqq"))
 
-def get_project_root():
-    """Get the project root directory."""
-    return Path(__file__).parent.parent
 
+NEWS_URL = "https://www.anthropic.com/news"
 
-def ensure_feeds_directory():
-    """Ensure the feeds directory exists."""
-    feeds_dir = get_project_root() / "feeds"
-    feeds_dir.mkdir(exist_ok=True)
-    return feeds_dir
 
-
-def fetch_news_content(url="https://www.anthropic.com/news"):
-    """Fetch news content from Anthropic's website."""
+def fetch_news_content(url=NEWS_URL, source="anthropic_news"):
+    """Fetch news content from Anthropic's website, or None if it has not changed since the last run."""
     try:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        }
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        return response.text
-    except requests.RequestException as e:
+        response = conditional_get(url, source=source)
+        return response.text if response is not None else None
+    except FetchError as e:
         logger.error(f"Error fetching news content: {str(e)}")
         raise
 
@@ -41,7 +30,7 @@ def fetch_news_content(url="https://www.anthropic.com/news"):
 def parse_news_html(html_content):
     """Parse the news HTML content and extract article information."""
     try:
-        soup = BeautifulSoup(html_content, "html.parser")
+        soup = make_soup(html_content, NEWS_CARD_STRAINER)
         articles = []
 
         # Find all article cards
@@ -60,14 +49,12 @@ def parse_news_html(html_content):
             # Extract date
             date_elem = card.select_one("div.PostList_post-date__djrOA")
             if date_elem:
-                try:
-                    date = datetime.strptime(date_elem.text.strip(), "%b %d, %Y")
-                    date = date.replace(tzinfo=pytz.UTC)
-                except ValueError:
+                date = parse_date(date_elem.text)
+                if date is None:
                     logger.warning(f"Could not parse date for article: {title}")
-                    date = datetime.now(pytz.UTC)
+                    date = datetime.now(timezone.utc)
             else:
-                date = datetime.now(pytz.UTC)
+                date = datetime.now(timezone.utc)
 
             # Extract category
             category_elem = card.select_one("span.text-label")
@@ -89,10 +76,20 @@ def parse_news_html(html_content):
         raise
 
 
-def generate_rss_feed(articles, feed_name="anthropic_news"):
-    """Generate RSS feed from news articles."""
-    try:
-        fg = FeedGenerator()
+@register
+class AnthropicNewsSource(FeedSource):
+    """Anthropic's newsroom."""
+
+    name = "anthropic_news"
+    url = NEWS_URL
+
+    def fetch(self):
+        return fetch_news_content(self.url, source=self.name)
+
+    def parse(self, html_content):
+        return parse_news_html(html_content)
+
+    def configure_feed(self, fg):
         fg.title("Anthropic News")
         fg.description("Latest news and updates from Anthropic")
         fg.link(href="https://www.anthropic.com/news")
@@ -103,84 +100,12 @@ def generate_rss_feed(articles, feed_name="anthropic_news"):
         fg.logo("https://www.anthropic.com/images/icons/apple-touch-icon.png")
         fg.subtitle("Latest updates from Anthropic's newsroom")
         fg.link(href="https://www.anthropic.com/news", rel="alternate")
-        fg.link(href=f"https://anthropic.com/news/feed_{feed_name}.xml", rel="self")
-
-        # Add entries
-        for article in articles:
-            fe = fg.add_entry()
-            fe.title(article["title"])
-            fe.description(article["description"])
-            fe.link(href=article["link"])
-            fe.published(article["date"])
-            fe.category(term=article["category"])
-            fe.id(article["link"])
-
-        logger.info("Successfully generated RSS feed")
-        return fg
-
-    except Exception as e:
-        logger.error(f"Error generating RSS feed: {str(e)}")
-        raise
-
-
-def save_rss_feed(feed_generator, feed_name="anthropic_news"):
-    """Save the RSS feed to a file in the feeds directory."""
-    try:
-        # Ensure feeds directory exists and get its path
-        feeds_dir = ensure_feeds_directory()
-
-        # Create the output file path
-        output_filename = feeds_dir / f"feed_{feed_name}.xml"
-
-        # Save the feed
-        feed_generator.rss_file(str(output_filename), pretty=True)
-        logger.info(f"Successfully saved RSS feed to {output_filename}")
-        return output_filename
-
-    except Exception as e:
-        logger.error(f"Error saving RSS feed: {str(e)}")
-        raise
-
-
-def get_existing_links_from_feed(feed_path):
-    """Parse the existing RSS feed and return a set of all article links."""
-    existing_links = set()
-    try:
-        if not feed_path.exists():
-            return existing_links
-        tree = ET.parse(feed_path)
-        root = tree.getroot()
-        # RSS 2.0: items under channel/item
-        for item in root.findall("./channel/item"):
-            link_elem = item.find("link")
-            if link_elem is not None and link_elem.text:
-                existing_links.add(link_elem.text.strip())
-    except Exception as e:
-        logger.warning(f"Failed to parse existing feed for deduplication: {str(e)}")
-    return existing_links
+        fg.link(href=f"https://anthropic.com/news/feed_{self.name}.xml", rel="self")
 
 
 def main(feed_name="anthropic_news"):
     """Main function to generate RSS feed from Anthropic's news page."""
-    try:
-        # Fetch news content
-        html_content = fetch_news_content()
-
-        # Parse articles from HTML
-        articles = parse_news_html(html_content)
-
-        # Generate RSS feed with all articles
-        feed = generate_rss_feed(articles, feed_name)
-
-        # Save feed to file
-        output_file = save_rss_feed(feed, feed_name)
-
-        logger.info(f"Successfully generated RSS feed with {len(articles)} articles")
-        return True
-
-    except Exception as e:
-        logger.error(f"Failed to generate RSS feed: {str(e)}")
-        return False
+    return AnthropicNewsSource(feed_name).run() != "failed"
 
 
 if __name__ == "__main__":
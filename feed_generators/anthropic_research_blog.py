@@ -1,76 +1,47 @@
-import undetected_chromedriver as uc
-from bs4 import BeautifulSoup
-from datetime import datetime
-import pytz
-from feedgen.feed import FeedGenerator
-import time
+import json
 import logging
-from pathlib import Path
+import re
+from utils.browser import PageReadiness, get_browser_pool
+from utils.dates import parse_date
+from utils.fetch import FetchError, fetch
+from utils.metrics import stage
+from utils.parsing import make_soup
+from utils.sources import FeedSource, register
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
 
 
-def get_project_root():
-    """Get the project root directory."""
-    return Path(__file__).parent.parent
+RESEARCH_URL = "https://www.anthropic.com/research"
 
+# The research page is ready once its article cards have rendered and stopped changing
+RESEARCH_PAGE_READINESS = PageReadiness(selector="a[href*='/research/']", min_count=5, stable_ms=1000, deadline=25)
 
-def ensure_feeds_directory():
-    """Ensure the feeds directory exists."""
-    feeds_dir = get_project_root() / "feeds"
-    feeds_dir.mkdir(exist_ok=True)
-    return feeds_dir
+# Next.js embeds page data either as a __NEXT_DATA__ JSON script (pages router) or as
+# self.__next_f.push([1, "..."]) chunks of the React Server Components payload (app router)
+NEXT_DATA_PATTERN = re.compile(r'<script id="__NEXT_DATA__" type="application/json"[^>]*>(.*?)</script>', re.DOTALL)
+RSC_CHUNK_PATTERN = re.compile(r'self\.__next_f\.push\(\[1,\s*("(?:[^"\\]|\\.)*")\]\)')
+RESEARCH_SLUG_PATTERN = re.compile(r"/research/([a-z0-9][a-z0-9-]*)")
 
 
-def setup_selenium_driver():
-    """Set up Selenium WebDriver with undetected-chromedriver."""
-    options = uc.ChromeOptions()
-    options.add_argument("--headless")  # Ensure headless mode is enabled
-    options.add_argument("--window-size=1920,1080")
-    options.add_argument("--disable-blink-features=AutomationControlled")
-    options.add_argument(
-        "--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-    )
-    return uc.Chrome(options=options)
+def fetch_research_content_static(url=RESEARCH_URL, source="anthropic_research"):
+    """Fetch the research page over plain HTTP, without running any JavaScript."""
+    logger.info(f"Fetching static content from URL: {url}")
+    return fetch(url, source=source).text
 
 
-def fetch_research_content_selenium(url="https://www.anthropic.com/research"):
-    """Fetch the fully loaded HTML content of the research page using Selenium."""
-    driver = None
+def fetch_research_content_selenium(url=RESEARCH_URL):
+    """Fetch the fully loaded HTML content of the research page using the shared browser."""
     try:
         logger.info(f"Fetching content from URL: {url}")
-        driver = setup_selenium_driver()
-        driver.get(url)
-
-        # Wait for the page to fully load
-        wait_time = 10
-        logger.info(f"Waiting {wait_time} seconds for the page to fully load...")
-        time.sleep(wait_time)
-
-        # Wait for research articles to load by checking for specific elements
-        try:
-            from selenium.webdriver.common.by import By
-            from selenium.webdriver.support.ui import WebDriverWait
-            from selenium.webdriver.support import expected_conditions as EC
-
-            # Wait for research articles to be present
-            WebDriverWait(driver, 15).until(EC.presence_of_element_located((By.CSS_SELECTOR, "a[href*='/research/']")))
-            logger.info("Research articles loaded successfully")
-        except:
-            logger.warning("Could not confirm articles loaded, proceeding anyway...")
-
-        html_content = driver.page_source
+        html_content = get_browser_pool().render(url, RESEARCH_PAGE_READINESS)
         logger.info("Successfully fetched HTML content")
         return html_content
 
     except Exception as e:
         logger.error(f"Error fetching content: {e}")
         raise
-    finally:
-        if driver:
-            driver.quit()
 
 
 def parse_date_string(date_str):
@@ -78,37 +49,139 @@ def parse_date_string(date_str):
     if not date_str or not date_str.strip():
         return None
 
-    date_str = date_str.strip()
+    date = parse_date(date_str)
+    if date is None:
+        logger.warning(f"Could not parse date: '{date_str.strip()}'")
+    return date
+
+
+# Title and date selectors in priority order. match_selectors evaluates all of them on a tag at
+# once, so the DOM can be indexed in one walk instead of running every selector against every
+# research link and its ancestors.
+TITLE_SELECTORS = ("h3", "h2", "h1", ".Card_headline__reaoT", "[class*='headline']", "[class*='title']")
+DATE_SELECTORS = (
+    ".detail-m.agate",  # Based on the HTML structure
+    "[class*='timestamp']",
+    "[class*='date']",
+    "time",
+    ".PostDetail_post-timestamp__TBJ0Z",
+    ".text-label",
+)
+SELECTOR_COUNT = len(TITLE_SELECTORS) + len(DATE_SELECTORS)
+TITLE_SLOTS = range(len(TITLE_SELECTORS))
+DATE_SLOTS = range(len(TITLE_SELECTORS), SELECTOR_COUNT)
+NO_MATCHES = (None,) * SELECTOR_COUNT
+
+
+def match_selectors(tag):
+    """Return whether a tag matches each of TITLE_SELECTORS + DATE_SELECTORS, in order."""
+    name = tag.name
+    classes = tag.get("class") or ()
+    if isinstance(classes, str):
+        classes = classes.split()
+    # [class*=...] matches against the whole attribute value
+    class_string = " ".join(classes)
+    return (
+        name == "h3",
+        name == "h2",
+        name == "h1",
+        "Card_headline__reaoT" in classes,
+        "headline" in class_string,
+        "title" in class_string,
+        "detail-m" in classes and "agate" in classes,
+        "timestamp" in class_string,
+        "date" in class_string,
+        name == "time",
+        "PostDetail_post-timestamp__TBJ0Z" in classes,
+        "text-label" in classes,
+    )
 
-    # Try different date formats
-    date_formats = [
-        "%b %d, %Y",  # Mar 27, 2025
-        "%B %d, %Y",  # March 27, 2025
-        "%Y-%m-%d",  # 2025-03-27
-        "%m/%d/%Y",  # 03/27/2025
-        "%d %b %Y",  # 27 Mar 2025
-        "%d %B %Y",  # 27 March 2025
-    ]
 
-    for date_format in date_formats:
-        try:
-            date = datetime.strptime(date_str, date_format)
-            return date.replace(tzinfo=pytz.UTC)
-        except ValueError:
+def index_research_page(soup):
+    """Walk the DOM once and index it for research link extraction.
+
+    Returns the research links in document order, and a map from id(tag) to a tuple holding,
+    for every selector in TITLE_SELECTORS + DATE_SELECTORS, the first descendant of that tag
+    matching it (what tag.select_one(selector) returns) or None. Tags without any matching
+    descendant are left out of the map.
+    """
+    # Pre-order walk: collect the research links and each tag's own selector matches
+    tags = [soup]
+    links = []
+    own_matches = {id(soup): (False,) * SELECTOR_COUNT}
+    for tag in soup.descendants:
+        if tag.name is None:  # Text, comments, ...
             continue
+        tags.append(tag)
+        own_matches[id(tag)] = match_selectors(tag)
+        if tag.name == "a" and "/research/" in (tag.get("href") or ""):
+            links.append(tag)
+
+    # In reverse pre-order every tag comes after all of its descendants, so the first match
+    # below a tag can be derived from its children: the child itself, else the child's first match
+    first_matches = {}
+    for tag in reversed(tags):
+        first = None
+        for child in tag.children:
+            if child.name is None:
+                continue
+            child_own = own_matches[id(child)]
+            child_first = first_matches.get(id(child))
+            if child_first is None and not any(child_own):
+                continue
+            if first is None:
+                first = [None] * SELECTOR_COUNT
+            for slot in range(SELECTOR_COUNT):
+                if first[slot] is None:
+                    first[slot] = child if child_own[slot] else (child_first[slot] if child_first else None)
+        if first is not None:
+            first_matches[id(tag)] = first
+
+    return links, first_matches
+
+
+def find_research_title(link, first_matches):
+    """Return the title for a research link: a title element in the link, then in up to 3 ancestors."""
+    node = link
+    for _ in range(4):  # The link itself, then up to 3 parent levels
+        if node is None:
+            break
+        first = first_matches.get(id(node), NO_MATCHES)
+        for slot in TITLE_SLOTS:
+            title_elem = first[slot]
+            if title_elem is not None and title_elem.text.strip():
+                return title_elem.text.strip()
+        node = node.parent
+    return None
 
-    logger.warning(f"Could not parse date: '{date_str}'")
+
+def find_research_date(link, first_matches):
+    """Return the date for a research link from the first date selector that yields a parseable date.
+
+    Each selector is looked up in the link, then its parent, then its grandparent.
+    """
+    levels = [link, link.parent, link.parent.parent if link.parent else None]
+    for slot in DATE_SLOTS:
+        for node in levels:
+            date_elem = first_matches.get(id(node), NO_MATCHES)[slot] if node is not None else None
+            if date_elem is not None:
+                break
+        if date_elem is not None:
+            parsed_date = parse_date_string(date_elem.text.strip())
+            if parsed_date:
+                return parsed_date
     return None
 
 
 def parse_research_html(html_content):
     """Parse the research HTML content and extract article information."""
     try:
-        soup = BeautifulSoup(html_content, "html.parser")
+        # Titles and dates are looked up in ancestors of each link, so the whole tree is needed
+        soup = make_soup(html_content)
         articles = []
 
-        # Look for research article links - updated selectors based on the HTML
-        research_links = soup.select("a[href*='/research/']")
+        # Index research links and their title/date candidates in a single DOM walk
+        research_links, first_matches = index_research_page(soup)
         logger.info(f"Found {len(research_links)} research links")
 
         found_links = set()  # To avoid duplicates
@@ -125,38 +198,8 @@ def parse_research_html(html_content):
 
                 found_links.add(href)
 
-                # Extract title - try multiple approaches
-                title = None
-
-                # Try to find title in the link itself
-                title_selectors = [
-                    "h3",
-                    "h2",
-                    "h1",
-                    ".Card_headline__reaoT",
-                    "[class*='headline']",
-                    "[class*='title']",
-                ]
-
-                for title_sel in title_selectors:
-                    title_elem = link.select_one(title_sel)
-                    if title_elem and title_elem.text.strip():
-                        title = title_elem.text.strip()
-                        break
-
-                # If no title found in the link, check parent elements
-                if not title:
-                    parent = link.parent
-                    for _ in range(3):  # Check up to 3 parent levels
-                        if parent:
-                            for title_sel in title_selectors:
-                                title_elem = parent.select_one(title_sel)
-                                if title_elem and title_elem.text.strip():
-                                    title = title_elem.text.strip()
-                                    break
-                            if title:
-                                break
-                            parent = parent.parent
+                # Extract title from the link or its parents
+                title = find_research_title(link, first_matches)
 
                 # If still no title, use the link text itself
                 if not title:
@@ -175,37 +218,10 @@ def parse_research_html(html_content):
                 else:
                     continue
 
-                # Extract date - try multiple selectors
-                date = None
-                date_selectors = [
-                    ".detail-m.agate",  # Based on the HTML structure
-                    "[class*='timestamp']",
-                    "[class*='date']",
-                    "time",
-                    ".PostDetail_post-timestamp__TBJ0Z",
-                    ".text-label",
-                ]
-
-                # Look for date in the link or its parents
-                for date_sel in date_selectors:
-                    date_elem = link.select_one(date_sel)
-                    if not date_elem and link.parent:
-                        # Check parent and sibling elements
-                        for parent_level in [link.parent, link.parent.parent if link.parent.parent else None]:
-                            if parent_level:
-                                date_elem = parent_level.select_one(date_sel)
-                                if date_elem:
-                                    break
-
-                    if date_elem:
-                        date_text = date_elem.text.strip()
-                        parsed_date = parse_date_string(date_text)
-                        if parsed_date:
-                            date = parsed_date
-                            break
-
+                # Extract date from the link or its parents
                 # If no date found, don't set a default date - let it be None
                 # This avoids the issue of updating dates to "now"
+                date = find_research_date(link, first_matches)
 
                 # Determine category from URL
                 category = "Research"
@@ -248,10 +264,122 @@ def parse_research_html(html_content):
         raise
 
 
-def generate_rss_feed(articles, feed_name="anthropic_research"):
-    """Generate RSS feed from research articles."""
+def iter_embedded_json(html_content):
+    """Yield the JSON documents embedded in a Next.js page."""
+    for match in NEXT_DATA_PATTERN.finditer(html_content):
+        try:
+            yield json.loads(match.group(1))
+        except ValueError:
+            continue
+
+    # RSC chunks are JS string literals; joined, they form lines of "<id>:<payload>"
+    chunks = []
+    for match in RSC_CHUNK_PATTERN.finditer(html_content):
+        try:
+            chunks.append(json.loads(match.group(1)))
+        except ValueError:
+            continue
+    for line in "".join(chunks).splitlines():
+        _, _, payload = line.partition(":")
+        if payload[:1] in ("[", "{"):
+            try:
+                yield json.loads(payload)
+            except ValueError:
+                continue
+
+
+def extract_embedded_articles(html_content):
+    """Extract research articles from the JSON a Next.js page embeds for hydration.
+
+    Only documents whose slug is linked as /research/<slug> somewhere on the page are kept, so
+    news posts and navigation entries in the same payload are ignored.
+    """
+    research_slugs = set(RESEARCH_SLUG_PATTERN.findall(html_content))
+    articles = {}
+
+    for document in iter_embedded_json(html_content):
+        stack = [document]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, list):
+                stack.extend(reversed(node))
+                continue
+            if not isinstance(node, dict):
+                continue
+            stack.extend(reversed(list(node.values())))
+
+            slug = node.get("slug")
+            if isinstance(slug, dict):  # Sanity-style {"_type": "slug", "current": "..."}
+                slug = slug.get("current")
+            title = node.get("title")
+            if not isinstance(slug, str) or slug not in research_slugs or slug in articles:
+                continue
+            if not isinstance(title, str) or len(title.strip()) < 5:
+                continue
+
+            date = None
+            for key in ("publishedOn", "publishedAt", "date"):
+                value = node.get(key)
+                if isinstance(value, str):
+                    # Drop the time part of ISO timestamps like 2025-03-27T00:00:00Z
+                    date = parse_date_string(value.split("T", 1)[0] if value[:4].isdigit() else value)
+                    break
+
+            title = " ".join(title.split())
+            articles[slug] = {
+                "title": title,
+                "link": f"https://www.anthropic.com/research/{slug}",
+                "date": date,
+                "category": "Research",
+                "description": title,
+            }
+
+    logger.info(f"Extracted {len(articles)} research articles from embedded JSON")
+    return list(articles.values())
+
+
+def fetch_research_articles(url=RESEARCH_URL, source="anthropic_research"):
+    """Fetch and parse research articles, using the browser only as a last resort.
+
+    Returns the articles and the tier that served them: "static-html" (server-rendered
+    anchors), "static-json" (embedded Next.js data) or "selenium".
+    """
     try:
-        fg = FeedGenerator()
+        with stage("fetch"):
+            html_content = fetch_research_content_static(url, source)
+        with stage("parse"):
+            articles = parse_research_html(html_content)
+            if articles:
+                return articles, "static-html"
+            articles = extract_embedded_articles(html_content)
+            if articles:
+                return articles, "static-json"
+        logger.info("Static fetch yielded no articles, falling back to Selenium")
+    except FetchError as e:
+        logger.warning(f"Static fetch failed, falling back to Selenium: {str(e)}")
+
+    with stage("fetch"):
+        html_content = fetch_research_content_selenium(url)
+    with stage("parse"):
+        return parse_research_html(html_content), "selenium"
+
+
+@register
+class AnthropicResearchSource(FeedSource):
+    """Anthropic's research page, served statically when possible and rendered otherwise."""
+
+    name = "anthropic_research"
+    url = RESEARCH_URL
+    # Only falls back to the browser when the static tiers find nothing
+    uses_browser = True
+    sort_by_date = True
+
+    def fetch_items(self):
+        articles, tier = fetch_research_articles(self.url, source=self.name)
+        self.logger.info(f"Research articles served by tier: {tier}")
+        return articles
+
+    def configure_feed(self, fg):
         fg.title("Anthropic Research")
         fg.description("Latest research papers and updates from Anthropic")
         fg.link(href="https://www.anthropic.com/research")
@@ -262,82 +390,12 @@ def generate_rss_feed(articles, feed_name="anthropic_research"):
         fg.logo("https://www.anthropic.com/images/icons/apple-touch-icon.png")
         fg.subtitle("Latest research from Anthropic")
         fg.link(href="https://www.anthropic.com/research", rel="alternate")
-        fg.link(href=f"https://anthropic.com/research/feed_{feed_name}.xml", rel="self")
-
-        # Sort articles by date (most recent first), but handle None dates
-        # Articles with dates come first, then articles without dates (preserve original order)
-        articles_with_date = [a for a in articles if a["date"] is not None]
-        articles_without_date = [a for a in articles if a["date"] is None]
-
-        articles_with_date.sort(key=lambda x: x["date"], reverse=True)
-        articles_sorted = articles_with_date + articles_without_date
-
-        # Add entries
-        for article in articles_sorted:
-            fe = fg.add_entry()
-            fe.title(article["title"])
-            fe.description(article["description"])
-            fe.link(href=article["link"])
-
-            # Only set published date if we have a valid date
-            if article["date"]:
-                fe.published(article["date"])
-
-            fe.category(term=article["category"])
-            fe.id(article["link"])
-
-        logger.info("Successfully generated RSS feed")
-        return fg
-
-    except Exception as e:
-        logger.error(f"Error generating RSS feed: {str(e)}")
-        raise
-
-
-def save_rss_feed(feed_generator, feed_name="anthropic_research"):
-    """Save the RSS feed to a file in the feeds directory."""
-    try:
-        # Ensure feeds directory exists and get its path
-        feeds_dir = ensure_feeds_directory()
-
-        # Create the output file path
-        output_filename = feeds_dir / f"feed_{feed_name}.xml"
-
-        # Save the feed
-        feed_generator.rss_file(str(output_filename), pretty=True)
-        logger.info(f"Successfully saved RSS feed to {output_filename}")
-        return output_filename
-
-    except Exception as e:
-        logger.error(f"Error saving RSS feed: {str(e)}")
-        raise
+        fg.link(href=f"https://anthropic.com/research/feed_{self.name}.xml", rel="self")
 
 
 def main(feed_name="anthropic_research"):
     """Main function to generate RSS feed from Anthropic's research page."""
-    try:
-        # Fetch research content using Selenium
-        html_content = fetch_research_content_selenium()
-
-        # Parse articles from HTML
-        articles = parse_research_html(html_content)
-
-        if not articles:
-            logger.warning("No articles found. Please check the HTML structure.")
-            return False
-
-        # Generate RSS feed
-        feed = generate_rss_feed(articles, feed_name)
-
-        # Save feed to file
-        output_file = save_rss_feed(feed, feed_name)
-
-        logger.info(f"Successfully generated RSS feed with {len(articles)} articles")
-        return True
-
-    except Exception as e:
-        logger.error(f"Failed to generate RSS feed: {str(e)}")
-        return False
+    return AnthropicResearchSource(feed_name).run() != "failed"
 
 
 if __name__ == "__main__":
@@ -1,40 +1,26 @@
-import requests
-from bs4 import BeautifulSoup
-from datetime import datetime
-import pytz
-from feedgen.feed import FeedGenerator
 import logging
-from pathlib import Path
+from utils.dates import parse_date
+from utils.fetch import FetchError
+from utils.http_cache import conditional_get
+from utils.parsing import Strainer, make_soup
+from utils.sources import FeedSource, register
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
 
+# Blog post links live inside <section> elements
+SECTION_STRAINER = Strainer("section")
 
-def get_project_root():
-    """Get the project root directory."""
-    # Since this script is in feed_generators/ollama_blog.py,
-    # we need to go up one level to reach the project root
-    return Path(__file__).parent.parent
+BLOG_URL = "https://ollama.com/blog"
 
 
-def ensure_feeds_directory():
-    """Ensure the feeds directory exists."""
-    feeds_dir = get_project_root() / "feeds"
-    feeds_dir.mkdir(exist_ok=True)
-    return feeds_dir
-
-
-def fetch_blog_content(url):
-    """Fetch blog content from the given URL."""
+def fetch_blog_content(url=BLOG_URL, source="ollama"):
+    """Fetch blog content from the given URL, or None if it has not changed since the last run."""
     try:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        }
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        return response.text
-    except requests.RequestException as e:
+        response = conditional_get(url, source=source)
+        return response.text if response is not None else None
+    except FetchError as e:
         logger.error(f"Error fetching blog content: {str(e)}")
         raise
 
@@ -42,7 +28,7 @@ def fetch_blog_content(url):
 def parse_blog_html(html_content):
     """Parse the blog HTML content and extract post information."""
     try:
-        soup = BeautifulSoup(html_content, "html.parser")
+        soup = make_soup(html_content, SECTION_STRAINER)
         blog_posts = []
 
         # Find all blog post sections
@@ -54,7 +40,9 @@ def parse_blog_html(html_content):
 
             # Extract date
             date_str = post.select_one("h3").text.strip()
-            date_obj = datetime.strptime(date_str, "%B %d, %Y")
+            date_obj = parse_date(date_str)
+            if date_obj is None:
+                raise ValueError(f"Unrecognized date '{date_str}' for post: {title}")
 
             # Extract description
             description = post.select_one("p").text.strip()
@@ -72,10 +60,20 @@ def parse_blog_html(html_content):
         raise
 
 
-def generate_rss_feed(blog_posts, feed_name="ollama"):
-    """Generate RSS feed from blog posts."""
-    try:
-        fg = FeedGenerator()
+@register
+class OllamaSource(FeedSource):
+    """The Ollama blog."""
+
+    name = "ollama"
+    url = BLOG_URL
+
+    def fetch(self):
+        return fetch_blog_content(self.url, source=self.name)
+
+    def parse(self, html_content):
+        return parse_blog_html(html_content)
+
+    def configure_feed(self, fg):
         fg.title("Ollama Blog")
         fg.description("Get up and running with large language models.")
         fg.link(href="https://ollama.com/blog")
@@ -86,64 +84,14 @@ def generate_rss_feed(blog_posts, feed_name="ollama"):
         fg.logo("https://ollama.com/public/icon-64x64.png")
         fg.subtitle("Latest updates from Ollama")
         fg.link(href="https://ollama.com/blog", rel="alternate")
-        fg.link(href=f"https://ollama.com/blog/feed_{feed_name}.xml", rel="self")
+        fg.link(href=f"https://ollama.com/blog/feed_{self.name}.xml", rel="self")
 
-        # Add entries
-        for post in blog_posts:
-            fe = fg.add_entry()
-            fe.title(post["title"])
-            fe.description(post["description"])
-            fe.link(href=post["link"])
-            fe.published(post["date"].replace(tzinfo=pytz.UTC))
-            fe.id(post["link"])
-
-        logger.info("Successfully generated RSS feed")
-        return fg
-
-    except Exception as e:
-        logger.error(f"Error generating RSS feed: {str(e)}")
-        raise
-
-
-def save_rss_feed(feed_generator, feed_name="ollama"):
-    """Save the RSS feed to a file in the feeds directory."""
-    try:
-        # Ensure feeds directory exists and get its path
-        feeds_dir = ensure_feeds_directory()
 
-        # Create the output file path
-        output_filename = feeds_dir / f"feed_{feed_name}.xml"
-
-        # Save the feed
-        feed_generator.rss_file(str(output_filename), pretty=True)
-        logger.info(f"Successfully saved RSS feed to {output_filename}")
-        return output_filename
-
-    except Exception as e:
-        logger.error(f"Error saving RSS feed: {str(e)}")
-        raise
-
-
-def main(blog_url="https://ollama.com/blog", feed_name="ollama"):
+def main(blog_url=BLOG_URL, feed_name="ollama"):
     """Main function to generate RSS feed from blog URL."""
-    try:
-        # Fetch blog content
-        html_content = fetch_blog_content(blog_url)
-
-        # Parse blog posts from HTML
-        blog_posts = parse_blog_html(html_content)
-
-        # Generate RSS feed
-        feed = generate_rss_feed(blog_posts, feed_name)
-
-        # Save feed to file
-        output_file = save_rss_feed(feed, feed_name)
-
-        return True
-
-    except Exception as e:
-        logger.error(f"Failed to generate RSS feed: {str(e)}")
-        return False
+    source = OllamaSource(feed_name)
+    source.url = blog_url
+    return source.run() != "failed"
 
 
 if __name__ == "__main__":
@@ -1,79 +1,96 @@
-import os
-import requests
-from bs4 import BeautifulSoup
-from datetime import datetime
-import pytz
-from feedgen.feed import FeedGenerator
+import threading
+from datetime import datetime, timedelta, timezone
 import logging
-from pathlib import Path
+from utils.dates import find_month_year
+from utils.fetch import FetchError, fetch
+from utils.http_cache import conditional_get
+from utils.metrics import bind_run
+from utils.parsing import Strainer, make_soup
+from utils.sources import FeedSource, register
+from utils.store import load_item_fingerprints, save_item_fingerprints
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+import hashlib
 import re
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
 
+# Essays are fetched concurrently, but never more than MAX_REQUESTS_PER_HOST at once from one host
+MAX_WORKERS = 8
+MAX_REQUESTS_PER_HOST = 4
 
-def get_project_root():
-    """Get the project root directory."""
-    return Path(__file__).parent.parent
+# Both the essay index and the essays keep their content in <font size="2"> blocks
+FONT_STRAINER = Strainer("font", size="2")
 
+_host_limits = {}
+_host_limits_lock = threading.Lock()
 
-def ensure_feeds_directory():
-    """Ensure the feeds directory exists."""
-    feeds_dir = get_project_root() / "feeds"
-    feeds_dir.mkdir(exist_ok=True)
-    return feeds_dir
+# Cached essays are re-fetched once they are this old, at most REVALIDATE_PER_RUN per run.
+# Set REVALIDATE_PER_RUN to 0 to disable the sweep.
+REVALIDATE_AFTER_DAYS = 30
+REVALIDATE_PER_RUN = 10
 
+ESSAYS_URL = "https://paulgraham.com/articles.html"
 
-def fetch_html_content(url):
-    """Fetch HTML content from the given URL."""
+
+def load_essay_cache():
+    """Load the essay cache from the store, keyed by essay URL."""
     try:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+        return {
+            url: {
+                "description": entry["description"],
+                "pub_date": entry["published"],
+                "fingerprint": entry["fingerprint"],
+                "fetched_at": entry["fetched_at"],
+            }
+            for url, entry in load_item_fingerprints("paulgraham").items()
         }
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        return response.text
-    except requests.RequestException as e:
-        logger.error(f"Error fetching content from {url}: {str(e)}")
-        raise
+    except Exception as e:
+        logger.warning(f"Failed to load essay cache: {e}")
+    return {}
 
 
-def extract_date_from_text(text):
-    """Helper function to extract date from text."""
-    months = [
-        "January",
-        "February",
-        "March",
-        "April",
-        "May",
-        "June",
-        "July",
-        "August",
-        "September",
-        "October",
-        "November",
-        "December",
-    ]
-
-    # Match "Month YYYY" pattern
-    for month in months:
-        pattern = f"{month}\\s+\\d{{4}}"
-        match = re.search(pattern, text)
-        if match:
-            date_str = match.group(0)
-            try:
-                date = datetime.strptime(f"{date_str} 1", "%B %Y %d")
-                return date.replace(tzinfo=pytz.UTC)
-            except ValueError:
-                continue
-    return None
+def save_essay_cache(cache):
+    """Insert or update essays in the store."""
+    try:
+        save_item_fingerprints(
+            "paulgraham",
+            {
+                url: {
+                    "description": data["description"],
+                    "published": data["pub_date"],
+                    "fingerprint": data["fingerprint"],
+                    "fetched_at": data["fetched_at"],
+                }
+                for url, data in cache.items()
+            },
+        )
+    except Exception as e:
+        logger.warning(f"Failed to save essay cache: {e}")
+
+
+def fetch_html_content(url, conditional=False, source="paulgraham"):
+    """Fetch HTML content from the given URL.
+
+    With `conditional`, the stored HTTP validators are sent and None is returned if the page
+    has not changed since the last run.
+    """
+    try:
+        if conditional:
+            response = conditional_get(url, source=source)
+            return response.text if response is not None else None
+        return fetch(url, source=source).text
+    except FetchError as e:
+        logger.error(f"Error fetching content from {url}: {str(e)}")
+        raise
 
 
 def get_article_content(article_html):
     """Extract the full article content and date."""
     try:
-        soup = BeautifulSoup(article_html, "html.parser")
+        soup = make_soup(article_html, FONT_STRAINER)
         content = None
         pub_date = None
 
@@ -83,7 +100,7 @@ def get_article_content(article_html):
             text = font.get_text().strip()
             if len(text) > 100:  # Main content is usually the longest text block
                 content = text
-                pub_date = extract_date_from_text(text)
+                pub_date = find_month_year(text)
                 if pub_date:
                     # Remove the date from the beginning of the content
                     content = re.sub(r"^[A-Za-z]+ \d{4}", "", content).lstrip()
@@ -96,49 +113,122 @@ def get_article_content(article_html):
         return None, None
 
 
-def parse_essays_page(html_content, base_url="https://paulgraham.com"):
-    """Parse the essays HTML page and extract blog post information."""
-    try:
-        soup = BeautifulSoup(html_content, "html.parser")
-        blog_posts = []
+def host_limit(url):
+    """Return the semaphore bounding concurrent requests to the host of `url`."""
+    host = urlparse(url).netloc
+    with _host_limits_lock:
+        if host not in _host_limits:
+            _host_limits[host] = threading.BoundedSemaphore(MAX_REQUESTS_PER_HOST)
+        return _host_limits[host]
 
-        # Find all essay links
-        links = soup.select('font[size="2"] a')
 
-        for link in links:
-            # Extract title and link
-            title = link.text.strip()
-            href = link.get("href")
-            if not href:
-                continue
+def fetch_essay(full_url):
+    """Fetch a single essay and return its cache entry.
 
-            full_url = f"{base_url}/{href}" if not href.startswith("http") else href
+    The essay is always parsed, so a revalidated essay is re-dated by the current rules even
+    when its page is unchanged; the fingerprint only tells whether it changed.
+    """
+    logger.debug(f"Fetching essay: {full_url}")
 
-            print("OLSH", full_url)
+    # Fetch article content once and reuse it
+    with host_limit(full_url):
+        article_html = fetch_html_content(full_url)
+    fetched_at = datetime.now(timezone.utc)
+    fingerprint = hashlib.sha256(article_html.encode("utf-8")).hexdigest()
 
-            # Fetch article content once and reuse it
-            article_html = fetch_html_content(full_url)
-            content, pub_date = get_article_content(article_html)
+    content, pub_date = get_article_content(article_html)
+    if content:
+        description = content[:500] + "..." if len(content) > 500 else content
+    else:
+        description = "No description available"
 
-            if content:
-                description = content[:500] + "..." if len(content) > 500 else content
-            else:
-                description = "No description available"
+    return {"description": description, "pub_date": pub_date, "fingerprint": fingerprint, "fetched_at": fetched_at}
 
-            blog_post = {
-                "title": title,
-                "link": full_url,
-                "description": description,
-                "pub_date": pub_date or datetime.now(pytz.UTC),  # Fallback to current date if none found
-            }
+
+def select_essays_to_fetch(urls, cache, now=None):
+    """Return the essay URLs to fetch: every uncached essay plus a slice of stale cached ones."""
+    now = now or datetime.now(timezone.utc)
+    new_urls = [url for url in urls if url not in cache]
+
+    stale_before = now - timedelta(days=REVALIDATE_AFTER_DAYS)
+    stale_urls = sorted(
+        (url for url in urls if url in cache and cache[url]["fetched_at"] < stale_before),
+        key=lambda url: cache[url]["fetched_at"],
+    )
+    return new_urls + stale_urls[:REVALIDATE_PER_RUN]
+
+
+def revalidation_due(cache, now=None):
+    """Whether any cached essay is old enough for select_essays_to_fetch to revalidate it."""
+    if REVALIDATE_PER_RUN <= 0:
+        return False
+    stale_before = (now or datetime.now(timezone.utc)) - timedelta(days=REVALIDATE_AFTER_DAYS)
+    return any(entry["fetched_at"] < stale_before for entry in cache.values())
+
+
+def extract_essay_links(html_content, base_url="https://paulgraham.com"):
+    """Return the (title, url) of every essay linked from the essays index page."""
+    soup = make_soup(html_content, FONT_STRAINER)
+
+    # Find all essay links
+    essays = []
+    for link in soup.select('font[size="2"] a'):
+        # Extract title and link
+        title = link.text.strip()
+        href = link.get("href")
+        if not href:
+            continue
+
+        full_url = f"{base_url}/{href}" if not href.startswith("http") else href
+        essays.append((title, full_url))
+    return essays
+
+
+def parse_essays_page(html_content, base_url="https://paulgraham.com", max_workers=MAX_WORKERS):
+    """Parse the essays HTML page and extract blog post information.
+
+    Essay descriptions and dates come from the essay cache; only new essays and a few stale
+    ones are fetched, on a thread pool. Posts are returned in the order they are linked.
+    """
+    try:
+        essays = extract_essay_links(html_content, base_url)
+
+        essay_cache = load_essay_cache()
+        urls_to_fetch = select_essays_to_fetch([url for _, url in essays], essay_cache)
+        logger.info(f"Fetching {len(urls_to_fetch)} of {len(essays)} essays ({len(essay_cache)} cached)")
+
+        fetched = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            entries = executor.map(bind_run(fetch_essay), urls_to_fetch)
+            for url, entry in zip(urls_to_fetch, entries):
+                cached = essay_cache.get(url)
+                if cached and cached["fingerprint"] != entry["fingerprint"]:
+                    logger.info(f"Essay changed since it was cached: {url}")
+                essay_cache[url] = fetched[url] = entry
+
+        # Only the essays fetched this run are written back
+        if fetched:
+            save_essay_cache(fetched)
+
+        blog_posts = []
+        for title, full_url in essays:
+            entry = essay_cache[full_url]
 
             # There are a handful (~7) old blog posts where parsing the date doesn't work very well.
             # In order to avoid sending hourly emails for this, we're just skipping them altogether.
             # We can spend more time on this if/when it ever becomes an issue.
-            if pub_date:
-                blog_posts.append(blog_post)
-            else:
-                print(f"Skipping post {title} - no date found")
+            if not entry["pub_date"]:
+                logger.info(f"Skipping post {title} - no date found")
+                continue
+
+            blog_posts.append(
+                {
+                    "title": title,
+                    "link": full_url,
+                    "description": entry["description"],
+                    "pub_date": entry["pub_date"],
+                }
+            )
 
         logger.info(f"Successfully parsed {len(blog_posts)} blog posts")
         return blog_posts
@@ -148,10 +238,30 @@ def parse_essays_page(html_content, base_url="https://paulgraham.com"):
         raise
 
 
-def generate_rss_feed(blog_posts, feed_name="paulgraham"):
-    """Generate RSS feed from blog posts."""
-    try:
-        fg = FeedGenerator()
+@register
+class PaulGrahamSource(FeedSource):
+    """Paul Graham's essays, with dates and descriptions taken from each essay."""
+
+    name = "paulgraham"
+    url = ESSAYS_URL
+    # The full essay history is large, so entries are streamed instead of built up in memory
+    stream = True
+    date_key = "pub_date"
+    # A few essays a year
+    interval = 24 * 60 * 60
+
+    def fetch(self):
+        html_content = fetch_html_content(self.url, conditional=True, source=self.name)
+        if html_content is None and revalidation_due(load_essay_cache()):
+            # The index is unchanged, but the sweep needs its essay links to revalidate the stale essays
+            logger.info("Essay index unchanged, fetching it anyway to revalidate stale essays")
+            html_content = fetch_html_content(self.url, source=self.name)
+        return html_content
+
+    def parse(self, html_content):
+        return parse_essays_page(html_content)
+
+    def configure_feed(self, fg):
         fg.title("Paul Graham Essays")
         fg.description("Essays by Paul Graham")
         fg.link(href="https://paulgraham.com/articles.html")
@@ -161,59 +271,14 @@ def generate_rss_feed(blog_posts, feed_name="paulgraham"):
         fg.author({"name": "Paul Graham"})
         fg.subtitle("Paul Graham's Essays and Writings")
         fg.link(href="https://paulgraham.com/articles.html", rel="alternate")
-        fg.link(href=f"https://paulgraham.com/feed_{feed_name}.xml", rel="self")
+        fg.link(href=f"https://paulgraham.com/feed_{self.name}.xml", rel="self")
 
-        # Add entries
-        for post in blog_posts:
-            fe = fg.add_entry()
-            fe.title(post["title"])
-            fe.description(post["description"])
-            fe.link(href=post["link"])
-            fe.published(post["pub_date"])
-            fe.id(post["link"])
-
-        logger.info("Successfully generated RSS feed")
-        return fg
-
-    except Exception as e:
-        logger.error(f"Error generating RSS feed: {str(e)}")
-        raise
 
-
-def save_rss_feed(feed_generator, feed_name="paulgraham"):
-    """Save the RSS feed to a file in the feeds directory."""
-    try:
-        feeds_dir = ensure_feeds_directory()
-        output_filename = feeds_dir / f"feed_{feed_name}.xml"
-        feed_generator.rss_file(str(output_filename), pretty=True)
-        logger.info(f"Successfully saved RSS feed to {output_filename}")
-        return output_filename
-
-    except Exception as e:
-        logger.error(f"Error saving RSS feed: {str(e)}")
-        raise
-
-
-def main(blog_url="https://paulgraham.com/articles.html", feed_name="paulgraham"):
+def main(blog_url=ESSAYS_URL, feed_name="paulgraham"):
     """Main function to generate RSS feed from blog URL."""
-    try:
-        # Fetch blog content
-        html_content = fetch_html_content(blog_url)
-
-        # Parse blog posts
-        blog_posts = parse_essays_page(html_content)
-
-        # Generate RSS feed
-        feed = generate_rss_feed(blog_posts, feed_name)
-
-        # Save feed to file
-        _output_file = save_rss_feed(feed, feed_name)
-
-        return True
-
-    except Exception as e:
-        logger.error(f"Failed to generate RSS feed: {str(e)}")
-        return False
+    source = PaulGrahamSource(feed_name)
+    source.url = blog_url
+    return source.run() != "failed"
 
 
 if __name__ == "__main__":
@@ -1,23 +1,260 @@
+import argparse
+import heapq
+import importlib
+import json
 import os
-import subprocess
+import random
+import signal
+import threading
+import time
 import logging
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from utils.browser import shutdown_browser_pool
+from utils.feed_merge import HISTORY_CAP_ENV, MERGE_ENV
+from utils.metrics import METRICS_FILE_ENV
+from utils.sources import SOURCES
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
 
-def run_all_feeds():
-    """Run all Python scripts in the feed_generators directory."""
-    feed_generators_dir = os.path.dirname(os.path.abspath(__file__))
-    for filename in os.listdir(feed_generators_dir):
-        if filename.endswith(".py") and filename != os.path.basename(__file__):
-            script_path = os.path.join(feed_generators_dir, filename)
-            logger.info(f"Running script: {script_path}")
-            result = subprocess.run(["python", script_path], capture_output=True, text=True)
-            if result.returncode == 0:
-                logger.info(f"Successfully ran script: {script_path}")
-            else:
-                logger.error(f"Error running script: {script_path}\n{result.stderr}")
+# Scripts in feed_generators that are not generators
+NON_GENERATOR_SCRIPTS = {"run_all_feeds.py", "serve_feeds.py"}
+# In daemon mode, a failed source is retried after at most this many seconds, instead of its full interval
+FAILED_RETRY_INTERVAL = 15 * 60
+
+
+@dataclass
+class FeedRunResult:
+    """Outcome of running a single feed source."""
+
+    source: str
+    kind: str
+    status: str
+    wall_time: float
+    items: int = None
+    feed_path: str = None
+
+
+def load_sources():
+    """Import every generator module in the feed_generators directory, registering its FeedSource.
+
+    Returns the registered sources, sorted by name.
+    """
+    feed_generators_dir = Path(__file__).resolve().parent
+    for path in sorted(feed_generators_dir.glob("*.py")):
+        if path.name in NON_GENERATOR_SCRIPTS:
+            continue
+        try:
+            importlib.import_module(path.stem)
+        except Exception as e:
+            logger.error(f"Error importing {path.name}: {str(e)}")
+    return dict(sorted(SOURCES.items()))
+
+
+def source_kind(source_class):
+    """Return the concurrency class of a feed source."""
+    return "selenium" if source_class.uses_browser else "http"
+
+
+def count_feed_items(feed_path):
+    """Count the items of an RSS feed file, or return None if it cannot be read."""
+    try:
+        return len(ET.parse(feed_path).getroot().findall("./channel/item"))
+    except (ET.ParseError, OSError) as e:
+        logger.warning(f"Could not count items in {feed_path}: {str(e)}")
+        return None
+
+
+def run_source(source_class):
+    """Run a single feed source in this interpreter and return its FeedRunResult."""
+    kind = source_kind(source_class)
+    source = source_class()
+    logger.info(f"Running source: {source.name} ({kind})")
+    start = time.monotonic()
+    status = source.run()
+    wall_time = time.monotonic() - start
+
+    if status == "failed":
+        logger.error(f"Source failed: {source.name} in {wall_time:.1f}s")
+        return FeedRunResult(source.name, kind, status, wall_time)
+    if status == "not_modified":
+        logger.info(f"Source not modified, skipped feed: {source.name} in {wall_time:.1f}s")
+        return FeedRunResult(source.name, kind, status, wall_time)
+    logger.info(f"Successfully ran source: {source.name} in {wall_time:.1f}s")
+    feed_path = source.feed_path
+    return FeedRunResult(source.name, kind, status, wall_time, count_feed_items(feed_path), str(feed_path))
+
+
+def log_summary(results, total_time):
+    """Log a per-source summary table of the run."""
+    logger.info(f"{'source':<36} {'kind':<9} {'status':<12} {'time':>7} {'items':>6}")
+    for r in results:
+        items = "-" if r.items is None else r.items
+        logger.info(f"{r.source:<36} {r.kind:<9} {r.status:<12} {r.wall_time:>6.1f}s {items:>6}")
+    serial_time = sum(r.wall_time for r in results)
+    failed = sum(1 for r in results if r.status not in ("ok", "unchanged", "not_modified"))
+    logger.info(
+        f"Ran {len(results)} sources ({failed} failed) in {total_time:.1f}s wall time "
+        f"(sum of source times: {serial_time:.1f}s)"
+    )
+
+
+def run_all_feeds(workers=4, selenium_workers=2, summary_json=None, only=None):
+    """Run every registered feed source concurrently, all in this interpreter.
+
+    Browser-backed sources get their own (small) worker pool, so a slow render never queues the
+    cheap requests-based sources behind it, and all of them share one Chrome (see utils.browser).
+    """
+    sources = load_sources()
+    if only:
+        sources = {name: source_class for name, source_class in sources.items() if name in only}
+    start = time.monotonic()
+    results = []
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="http") as http_pool, ThreadPoolExecutor(
+        max_workers=selenium_workers, thread_name_prefix="selenium"
+    ) as selenium_pool:
+        futures = [
+            (selenium_pool if source_class.uses_browser else http_pool).submit(run_source, source_class)
+            for source_class in sources.values()
+        ]
+        for future in as_completed(futures):
+            results.append(future.result())
+    browser_stats = shutdown_browser_pool()
+    total_time = time.monotonic() - start
+
+    results.sort(key=lambda r: r.source)
+    log_summary(results, total_time)
+
+    if summary_json:
+        summary = {"wall_time": total_time, "browser": browser_stats, "results": [asdict(r) for r in results]}
+        Path(summary_json).write_text(json.dumps(summary, indent=2))
+        logger.info(f"Wrote run summary to {summary_json}")
+
+    return results
+
+
+def next_run_delay(source_class, status, jitter):
+    """Return the seconds until the next daemon run of a source: its interval, +/- `jitter` (a fraction)."""
+    interval = source_class.interval
+    if status == "failed":
+        interval = min(interval, FAILED_RETRY_INTERVAL)
+    return interval * (1 + random.uniform(-jitter, jitter))
+
+
+def run_daemon(workers=4, selenium_workers=2, only=None, jitter=0.1):
+    """Run every registered feed source forever, each on its own interval (FeedSource.interval).
+
+    The process stays resident, so HTTP sessions, the shared Chrome and in-process caches stay
+    warm between runs. Due sources are queued on the same worker pools as run_all_feeds. A source
+    is taken off the schedule while it runs and rescheduled from when it finishes, so a slow
+    source only ever delays itself. Stops on SIGINT or SIGTERM once the running sources finish.
+    """
+    sources = load_sources()
+    if only:
+        sources = {name: source_class for name, source_class in sources.items() if name in only}
+    # (due time, source name), soonest first; everything is due at startup
+    schedule = [(time.monotonic(), name) for name in sources]
+    heapq.heapify(schedule)
+    running = set()
+    lock = threading.Lock()
+    wake = threading.Event()
+    stop = threading.Event()
+
+    def request_stop(signum, frame):
+        logger.info(f"Received signal {signum}, stopping after the running sources finish")
+        stop.set()
+        wake.set()
+
+    signal.signal(signal.SIGINT, request_stop)
+    signal.signal(signal.SIGTERM, request_stop)
+
+    def finished(name, future):
+        if future.cancelled():
+            return
+        source_class = sources[name]
+        try:
+            status = future.result().status
+        except Exception as e:
+            logger.error(f"Error running {name}: {str(e)}")
+            status = "failed"
+        delay = next_run_delay(source_class, status, jitter)
+        with lock:
+            running.discard(name)
+            heapq.heappush(schedule, (time.monotonic() + delay, name))
+            # A failed render may have left Chrome unusable: restart it, unless another render is under way
+            if status == "failed" and source_class.uses_browser:
+                if not any(sources[other].uses_browser for other in running):
+                    shutdown_browser_pool()
+        logger.info(f"Next run of {name} in {delay / 60:.1f} min")
+        wake.set()
+
+    intervals = ", ".join(f"{name} every {cls.interval / 60:.0f} min" for name, cls in sources.items())
+    logger.info(f"Running {len(sources)} sources as a daemon: {intervals}")
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="http") as http_pool, ThreadPoolExecutor(
+        max_workers=selenium_workers, thread_name_prefix="selenium"
+    ) as selenium_pool:
+        while not stop.is_set():
+            # Cleared before reading the schedule, so a source finishing meanwhile still wakes the loop
+            wake.clear()
+            submitted = []
+            with lock:
+                now = time.monotonic()
+                while schedule and schedule[0][0] <= now:
+                    _, name = heapq.heappop(schedule)
+                    source_class = sources[name]
+                    running.add(name)
+                    pool = selenium_pool if source_class.uses_browser else http_pool
+                    submitted.append((name, pool.submit(run_source, source_class)))
+                timeout = schedule[0][0] - now if schedule else None
+            # Outside the lock: a future that is already done runs its callback right here, and finished takes the lock
+            for name, future in submitted:
+                future.add_done_callback(lambda f, name=name: finished(name, f))
+            wake.wait(timeout)
+        # Sources queued but not started yet are dropped; the running ones finish
+        http_pool.shutdown(cancel_futures=True)
+        selenium_pool.shutdown(cancel_futures=True)
+    shutdown_browser_pool()
+    logger.info("Daemon stopped")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run all feed generators.")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent plain-HTTP sources (default: 4)")
+    parser.add_argument(
+        "--selenium-workers", type=int, default=2, help="Concurrent Selenium-backed sources (default: 2)"
+    )
+    parser.add_argument("--only", nargs="+", metavar="NAME", help="Run only these sources (by feed name)")
+    parser.add_argument("--summary-json", help="Also write the run summary as JSON to this path")
+    parser.add_argument(
+        "--merge", action="store_true", help="Merge new items into the existing feeds instead of regenerating them"
+    )
+    parser.add_argument("--history-cap", type=int, help="Maximum items a merged feed keeps (default: 500)")
+    parser.add_argument("--metrics-file", help="Append each source's per-stage metrics as JSON Lines to this path")
+    parser.add_argument(
+        "--daemon", action="store_true", help="Stay resident and run each source on its own interval, until stopped"
+    )
+    parser.add_argument(
+        "--jitter", type=float, default=0.1, help="Daemon intervals vary by up to this fraction (default: 0.1)"
+    )
+    return parser.parse_args()
+
 
 if __name__ == "__main__":
-    run_all_feeds()
+    args = parse_args()
+    # Passed through the environment, where the generators also read them when run on their own
+    if args.merge:
+        os.environ[MERGE_ENV] = "1"
+    if args.history_cap is not None:
+        os.environ[HISTORY_CAP_ENV] = str(args.history_cap)
+    if args.metrics_file:
+        os.environ[METRICS_FILE_ENV] = os.path.abspath(args.metrics_file)
+    if args.daemon:
+        run_daemon(workers=args.workers, selenium_workers=args.selenium_workers, only=args.only, jitter=args.jitter)
+    else:
+        run_all_feeds(
+            workers=args.workers, selenium_workers=args.selenium_workers, summary_json=args.summary_json, only=args.only
+        )
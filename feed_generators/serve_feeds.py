@@ -0,0 +1,254 @@
+import argparse
+import hashlib
+import logging
+import threading
+import xml.etree.ElementTree as ET
+from collections import OrderedDict
+from email.utils import formatdate
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import unquote, urlsplit
+
+from utils.feed_writer import compressed_path, item_fingerprint, json_item_fingerprint
+from utils.store import FEEDS_DIR
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+# Only feed files are served: feeds/ also holds the generators' store
+CONTENT_TYPES = {
+    ".xml": "application/rss+xml; charset=utf-8",
+    ".atom": "application/atom+xml; charset=utf-8",
+    ".json": "application/feed+json; charset=utf-8",
+}
+# Content-Encoding -> suffix of the precompressed sibling (see utils.feed_writer.COMPRESSORS), preferred first
+ENCODINGS = {"br": ".br", "gzip": ".gz"}
+
+
+def is_feed_name(name):
+    """Whether a request path names a feed file directly inside the feeds directory."""
+    return name.startswith("feed_") and "/" not in name and "\\" not in name and Path(name).suffix in CONTENT_TYPES
+
+
+def accepted_encodings(header):
+    """Return the content codings an Accept-Encoding header accepts (q > 0)."""
+    accepted = set()
+    for part in (header or "").split(","):
+        coding, _, params = part.partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding.strip() and quality > 0:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+def etag_matches(if_none_match, etag):
+    """Whether an If-None-Match header matches an ETag, using the weak comparison RFC 9110 asks for."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+
+
+def file_versions(path):
+    """Return the (mtime_ns, size) of a feed file and of each of its precompressed siblings, None if missing.
+
+    The writers publish the feed before its siblings, so a feed's cache entry is only valid
+    while all of them are unchanged.
+    """
+    versions = []
+    for file in [path] + [compressed_path(path, suffix) for suffix in ENCODINGS.values()]:
+        try:
+            stat = file.stat()
+        except FileNotFoundError:
+            versions.append(None)
+            continue
+        versions.append((stat.st_mtime_ns, stat.st_size))
+    return tuple(versions)
+
+
+class CachedFeed:
+    """A feed file and its precompressed siblings, read into memory once per version of the files."""
+
+    def __init__(self, path, versions):
+        self.versions = versions
+        mtime_ns = versions[0][0]
+        self.content_type = CONTENT_TYPES[path.suffix]
+        self.last_modified = formatdate(mtime_ns / 1e9, usegmt=True)
+        self.bodies = {"identity": path.read_bytes()}
+        for (encoding, suffix), version in zip(ENCODINGS.items(), versions[1:]):
+            # A sibling older than the feed is stale, so the feed is served uncompressed instead
+            if version is None or version[0] < mtime_ns:
+                continue
+            try:
+                self.bodies[encoding] = compressed_path(path, suffix).read_bytes()
+            except FileNotFoundError:
+                continue
+        self.tag = self._fingerprint(path)
+
+    def _fingerprint(self, path):
+        # The writers only rewrite a feed when its items change, so the item fingerprint
+        # identifies the bytes: strong ETags that survive regenerating an unchanged feed
+        fingerprint = json_item_fingerprint if path.suffix == ".json" else item_fingerprint
+        try:
+            return fingerprint(self.bodies["identity"])[:32]
+        except (ET.ParseError, ValueError, KeyError) as e:
+            logger.warning(f"Could not fingerprint the items of {path}, hashing the file instead: {str(e)}")
+            return hashlib.sha256(self.bodies["identity"]).hexdigest()[:32]
+
+    @property
+    def nbytes(self):
+        return sum(len(body) for body in self.bodies.values())
+
+    def negotiate(self, accept_encoding):
+        """Return the encoding to serve for an Accept-Encoding header, among the bodies held."""
+        accepted = accepted_encodings(accept_encoding)
+        for encoding in ENCODINGS:
+            if encoding in self.bodies and (encoding in accepted or "*" in accepted):
+                return encoding
+        return "identity"
+
+    def etag(self, encoding):
+        # Each encoding is its own representation, so it gets its own strong ETag
+        return f'"{self.tag}"' if encoding == "identity" else f'"{self.tag}-{encoding}"'
+
+
+class FeedCache:
+    """Feeds held in memory, least recently used evicted first, reloaded when their file changes.
+
+    Every lookup stats the file and its precompressed siblings, so a feed the generators replace
+    (they rename new files into place) is reloaded on the next request; the stats are all an
+    unchanged feed costs.
+    """
+
+    def __init__(self, directory=FEEDS_DIR, max_bytes=64 * 1024 * 1024):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._feeds = OrderedDict()
+        self._nbytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, name):
+        """Return the CachedFeed of a feed file name, or None if there is no such feed."""
+        if not is_feed_name(name):
+            return None
+        path = self.directory / name
+        versions = file_versions(path)
+        if versions[0] is None:
+            self._evict(name)
+            return None
+
+        with self._lock:
+            feed = self._feeds.get(name)
+            if feed and feed.versions == versions:
+                self._feeds.move_to_end(name)
+                return feed
+
+        # Read outside the lock, so a reload doesn't stall requests for other feeds
+        try:
+            feed = CachedFeed(path, versions)
+        except FileNotFoundError:
+            return None
+        with self._lock:
+            old = self._feeds.pop(name, None)
+            if old:
+                self._nbytes -= old.nbytes
+            self._feeds[name] = feed
+            self._nbytes += feed.nbytes
+            while self._nbytes > self.max_bytes and len(self._feeds) > 1:
+                _, evicted = self._feeds.popitem(last=False)
+                self._nbytes -= evicted.nbytes
+        return feed
+
+    def _evict(self, name):
+        with self._lock:
+            old = self._feeds.pop(name, None)
+            if old:
+                self._nbytes -= old.nbytes
+
+
+class FeedRequestHandler(BaseHTTPRequestHandler):
+    """Serves GET and HEAD for the feeds of the server's FeedCache."""
+
+    # Keep-alive, so polling readers reuse their connection
+    protocol_version = "HTTP/1.1"
+    server_version = "rss-feeds"
+
+    def do_GET(self):
+        self._serve(send_body=True)
+
+    def do_HEAD(self):
+        self._serve(send_body=False)
+
+    def _serve(self, send_body):
+        name = unquote(urlsplit(self.path).path).lstrip("/")
+        feed = self.server.cache.get(name)
+        if feed is None:
+            self.send_response(HTTPStatus.NOT_FOUND)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        encoding = feed.negotiate(self.headers.get("Accept-Encoding"))
+        etag = feed.etag(encoding)
+        not_modified = etag_matches(self.headers.get("If-None-Match"), etag)
+        self.send_response(HTTPStatus.NOT_MODIFIED if not_modified else HTTPStatus.OK)
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", feed.last_modified)
+        self.send_header("Cache-Control", f"public, max-age={self.server.max_age}")
+        self.send_header("Vary", "Accept-Encoding")
+        if not_modified:
+            self.end_headers()
+            return
+
+        body = feed.bodies[encoding]
+        self.send_header("Content-Type", feed.content_type)
+        if encoding != "identity":
+            self.send_header("Content-Encoding", encoding)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Per-request lines at debug level: at thousands of polls, logging would cost more than serving
+        logger.debug(f"{self.address_string()} {format % args}")
+
+
+def make_server(directory=FEEDS_DIR, host="127.0.0.1", port=8000, max_age=300, cache_bytes=64 * 1024 * 1024):
+    """Return a threading HTTP server for the feeds of a directory; port 0 picks a free port."""
+    server = ThreadingHTTPServer((host, port), FeedRequestHandler)
+    server.cache = FeedCache(directory, cache_bytes)
+    server.max_age = max_age
+    return server
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Serve the feeds directory over HTTP.")
+    parser.add_argument("--directory", default=str(FEEDS_DIR), help="Directory of the feeds (default: feeds/)")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8000, help="Port to listen on (default: 8000)")
+    parser.add_argument("--max-age", type=int, default=300, help="Cache-Control max-age in seconds (default: 300)")
+    parser.add_argument("--cache-mb", type=int, default=64, help="Memory for cached feeds, in MiB (default: 64)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    server = make_server(args.directory, args.host, args.port, args.max_age, args.cache_mb * 1024 * 1024)
+    logger.info(f"Serving {args.directory} on http://{args.host}:{server.server_address[1]}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Shutting down")
+    finally:
+        server.server_close()
@@ -0,0 +1 @@
+"""Helpers shared by the feed generators in this directory."""
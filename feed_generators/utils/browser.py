@@ -0,0 +1,244 @@
+import atexit
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+
+from utils.fetch import USER_AGENT
+from utils.metrics import count
+
+logger = logging.getLogger(__name__)
+
+
+def launch_chrome():
+    """Launch headless Chrome with undetected-chromedriver."""
+    # Imported here: it pulls in selenium, websockets and trio, which static fetches never need
+    import undetected_chromedriver as uc
+
+    options = uc.ChromeOptions()
+    options.add_argument("--headless")  # Ensure headless mode is enabled
+    options.add_argument("--window-size=1920,1080")
+    options.add_argument("--disable-blink-features=AutomationControlled")
+    options.add_argument(f"--user-agent={USER_AGENT}")
+    # Navigation returns immediately; BrowserPool.render decides when a tab is ready
+    options.page_load_strategy = "none"
+    return uc.Chrome(options=options)
+
+
+@dataclass(frozen=True)
+class PageReadiness:
+    """When a rendered page counts as ready.
+
+    The page is ready once at least `min_count` elements match `selector` and the DOM has not
+    changed for `stable_ms` milliseconds. `deadline` (seconds) is a hard cap on the whole wait.
+    Without a selector, a fully loaded document with a stable DOM is enough.
+    """
+
+    selector: str = None
+    min_count: int = 1
+    stable_ms: int = 500
+    deadline: float = 20
+
+
+# Returns the document state, the number of elements matching the selector and the total element
+# count; the last two form the signature used to detect when the DOM has stopped changing.
+READINESS_PROBE_JS = """
+const selector = arguments[0];
+return [
+    document.readyState,
+    selector ? document.querySelectorAll(selector).length : 0,
+    document.getElementsByTagName("*").length,
+];
+"""
+
+
+def process_tree_rss_kb(root_pid):
+    """Return the summed resident set size of a process and its descendants, in KiB.
+
+    Reads /proc, so this returns None on platforms without it.
+    """
+    if root_pid is None or not os.path.isdir("/proc"):
+        return None
+
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # The command name may contain spaces, so split after its closing parenthesis
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+
+    total_kb = 0
+    pending = [root_pid]
+    while pending:
+        pid = pending.pop()
+        pending.extend(children.get(pid, []))
+        try:
+            with open(f"/proc/{pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total_kb += int(line.split()[1])
+                        break
+        except OSError:
+            continue
+    return total_kb
+
+
+class BrowserPool:
+    """A single headless Chrome shared by every Selenium-backed fetcher in the process.
+
+    Chrome is launched lazily on the first render. Each render gets its own tab; tabs load
+    concurrently, while WebDriver commands are serialized because the driver is not thread safe.
+    """
+
+    def __init__(self, max_tabs=4, poll_interval=0.25):
+        self.max_tabs = max_tabs
+        self.poll_interval = poll_interval
+        self._driver = None
+        self._lock = threading.RLock()
+        self._tab_slots = threading.BoundedSemaphore(max_tabs)
+        self.startup_time = None
+        self.peak_rss_kb = None
+        self.pages_rendered = 0
+
+    def _ensure_started(self):
+        if self._driver is None:
+            logger.info("Launching shared headless Chrome")
+            start = time.monotonic()
+            self._driver = launch_chrome()
+            self.startup_time = time.monotonic() - start
+            logger.info(f"Chrome started in {self.startup_time:.1f}s")
+            self._sample_rss()
+        return self._driver
+
+    def _sample_rss(self):
+        rss_kb = process_tree_rss_kb(getattr(self._driver, "browser_pid", None))
+        if rss_kb is not None:
+            self.peak_rss_kb = max(self.peak_rss_kb or 0, rss_kb)
+
+    def _open_tab(self, url):
+        with self._lock:
+            driver = self._ensure_started()
+            driver.switch_to.new_window("tab")
+            handle = driver.current_window_handle
+            try:
+                driver.get(url)
+            except Exception:
+                # render never learns the handle, so close the tab here or it leaks
+                try:
+                    self._close_tab(handle)
+                except Exception as e:
+                    logger.warning(f"Failed to close the tab of {url}: {e}")
+                raise
+            return handle
+
+    def _close_tab(self, handle):
+        with self._lock:
+            driver = self._driver
+            driver.switch_to.window(handle)
+            driver.close()
+            # Keep the driver attached to a live window for the next command
+            driver.switch_to.window(driver.window_handles[0])
+
+    def _probe(self, handle, selector):
+        with self._lock:
+            self._driver.switch_to.window(handle)
+            return self._driver.execute_script(READINESS_PROBE_JS, selector)
+
+    def _wait_until_ready(self, handle, url, readiness):
+        """Poll the tab until it satisfies `readiness` or its deadline passes."""
+        start = time.monotonic()
+        stable_for = readiness.stable_ms / 1000
+        last_signature = None
+        last_change = start
+        while True:
+            now = time.monotonic()
+            state, matches, elements = self._probe(handle, readiness.selector)
+            signature = (matches, elements)
+            if signature != last_signature:
+                last_signature = signature
+                last_change = now
+
+            present = matches >= readiness.min_count if readiness.selector else state == "complete"
+            if present and now - last_change >= stable_for:
+                logger.info(f"Page ready after {now - start:.1f}s ({matches} matches, {elements} elements): {url}")
+                return True
+            if now - start >= readiness.deadline:
+                logger.warning(
+                    f"Page not ready within {readiness.deadline}s ({matches} matches, {elements} elements), "
+                    f"proceeding anyway: {url}"
+                )
+                return False
+            time.sleep(self.poll_interval)
+
+    def render(self, url, readiness=PageReadiness()):
+        """Load a URL in a fresh tab and return its page source once `readiness` is met."""
+        with self._tab_slots:
+            logger.info(f"Rendering {url}")
+            start = time.monotonic()
+            handle = self._open_tab(url)
+            try:
+                self._wait_until_ready(handle, url, readiness)
+                with self._lock:
+                    self._driver.switch_to.window(handle)
+                    html_content = self._driver.page_source
+                    self.pages_rendered += 1
+                    self._sample_rss()
+                logger.info(f"Rendered {url} in {time.monotonic() - start:.1f}s")
+                count("bytes_rendered", len(html_content.encode("utf-8")))
+                return html_content
+            finally:
+                self._close_tab(handle)
+
+    def stats(self):
+        """Return startup cost, pages rendered and peak (sampled) RSS of the browser."""
+        return {
+            "startup_time": self.startup_time,
+            "pages_rendered": self.pages_rendered,
+            "peak_rss_mb": None if self.peak_rss_kb is None else round(self.peak_rss_kb / 1024, 1),
+        }
+
+    def shutdown(self):
+        """Quit Chrome if it was started, logging its resource usage."""
+        with self._lock:
+            if self._driver is None:
+                return
+            stats = self.stats()
+            try:
+                self._driver.quit()
+            except Exception as e:
+                logger.warning(f"Error shutting down Chrome: {e}")
+            self._driver = None
+            logger.info(
+                f"Shut down shared Chrome: startup {stats['startup_time']:.1f}s, "
+                f"{stats['pages_rendered']} pages rendered, peak RSS {stats['peak_rss_mb']} MB"
+            )
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_browser_pool():
+    """Return the process-wide BrowserPool, creating it on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = BrowserPool()
+            atexit.register(_pool.shutdown)
+        return _pool
+
+
+def shutdown_browser_pool():
+    """Shut down the process-wide BrowserPool and return its stats, or None if it was never used."""
+    with _pool_lock:
+        if _pool is None or _pool.startup_time is None:
+            return None
+        stats = _pool.stats()
+        _pool.shutdown()
+        return stats
@@ -0,0 +1,68 @@
+import re
+from datetime import datetime, timezone
+from functools import lru_cache
+
+MONTH_NAMES = [
+    "January",
+    "February",
+    "March",
+    "April",
+    "May",
+    "June",
+    "July",
+    "August",
+    "September",
+    "October",
+    "November",
+    "December",
+]
+# Full and three-letter names, lowercased, to month number (what strptime's %B and %b accept)
+MONTHS = {name.lower(): number for number, name in enumerate(MONTH_NAMES, 1)}
+MONTHS.update({name[:3].lower(): number for number, name in enumerate(MONTH_NAMES, 1)})
+
+# Every supported format as one alternation, so a string is matched in a single pass
+DATE_PATTERN = re.compile(
+    r"""
+    (?P<mdy_month>[A-Za-z]+)\s+(?P<mdy_day>\d{1,2}),\s+(?P<mdy_year>\d{4})    # Mar 27, 2025 / March 27, 2025
+    | (?P<iso_year>\d{4})-(?P<iso_month>\d{1,2})-(?P<iso_day>\d{1,2})         # 2025-03-27
+    | (?P<us_month>\d{1,2})/(?P<us_day>\d{1,2})/(?P<us_year>\d{4})            # 03/27/2025
+    | (?P<dmy_day>\d{1,2})\s+(?P<dmy_month>[A-Za-z]+)\s+(?P<dmy_year>\d{4})   # 27 Mar 2025 / 27 March 2025
+    """,
+    re.VERBOSE,
+)
+# "Month YYYY" anywhere in a text, as at the top of Paul Graham's essays
+MONTH_YEAR_PATTERN = re.compile(rf"({'|'.join(MONTH_NAMES)})\s+(\d{{4}})")
+
+
+def _month_number(month):
+    return month if month.isdigit() else MONTHS.get(month.lower())
+
+
+@lru_cache(maxsize=4096)
+def parse_date(text):
+    """Parse a date in any of the formats of DATE_PATTERN into a UTC datetime at midnight.
+
+    Returns None if `text` is empty, in no supported format or not a valid date. Results are
+    memoized, since listing pages repeat the same few dates.
+    """
+    if not text:
+        return None
+    match = DATE_PATTERN.fullmatch(text.strip())
+    if not match:
+        return None
+    fields = {name.split("_")[1]: value for name, value in match.groupdict().items() if value is not None}
+    month = _month_number(fields["month"])
+    if month is None:
+        return None
+    try:
+        return datetime(int(fields["year"]), int(month), int(fields["day"]), tzinfo=timezone.utc)
+    except ValueError:
+        return None
+
+
+def find_month_year(text):
+    """Return the first "Month YYYY" in a text as a UTC datetime on the 1st of that month, or None."""
+    match = MONTH_YEAR_PATTERN.search(text)
+    if not match:
+        return None
+    return datetime(int(match.group(2)), MONTHS[match.group(1).lower()], 1, tzinfo=timezone.utc)
@@ -0,0 +1,94 @@
+import logging
+import os
+import xml.etree.ElementTree as ET
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# Merge mode keeps items that scrolled off a listing page instead of rebuilding feeds from scratch
+MERGE_ENV = "RSS_FEEDS_MERGE"
+HISTORY_CAP_ENV = "RSS_FEEDS_HISTORY_CAP"
+DEFAULT_HISTORY_CAP = 500
+
+# Item fields compared to decide whether a re-listed item changed
+COMPARED_FIELDS = ("title", "description", "category")
+
+
+def merge_enabled():
+    """Return whether merge mode is on, i.e. RSS_FEEDS_MERGE is set to a truthy value."""
+    return os.environ.get(MERGE_ENV, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def history_cap():
+    """Return the maximum number of items a merged feed keeps (RSS_FEEDS_HISTORY_CAP)."""
+    try:
+        return max(int(os.environ.get(HISTORY_CAP_ENV, DEFAULT_HISTORY_CAP)), 0)
+    except ValueError:
+        logger.warning(f"Invalid {HISTORY_CAP_ENV}, using {DEFAULT_HISTORY_CAP}")
+        return DEFAULT_HISTORY_CAP
+
+
+def load_feed_items(feed_path, date_key="date"):
+    """Load the items of an existing RSS feed as generator item dicts, keyed by link.
+
+    The dicts carry title, link, description, category and the publication date under
+    `date_key`, in feed order. Returns an empty dict if the feed is missing or unreadable.
+    """
+    feed_path = Path(feed_path)
+    items = {}
+    if not feed_path.exists():
+        return items
+    try:
+        for item in ET.parse(feed_path).getroot().iterfind("./channel/item"):
+            link = (item.findtext("link") or "").strip()
+            if not link:
+                continue
+            pub_date = item.findtext("pubDate")
+            items[link] = {
+                "title": (item.findtext("title") or "").strip(),
+                "link": link,
+                "description": item.findtext("description") or "",
+                "category": item.findtext("category"),
+                date_key: parsedate_to_datetime(pub_date) if pub_date else None,
+            }
+    except (ET.ParseError, TypeError, ValueError) as e:
+        logger.warning(f"Failed to load existing feed {feed_path} for merging: {str(e)}")
+        return {}
+    return items
+
+
+def merge_feed_items(items, feed_path, date_key="date", cap=None):
+    """Merge freshly parsed items into the items of the existing feed at `feed_path`.
+
+    Every fresh item is kept, in the order given, replacing the existing item with the same
+    link. Existing items that are no longer listed follow in their previous order; when the
+    merged feed would exceed `cap` items (history_cap() by default), the oldest are dropped.
+    """
+    cap = history_cap() if cap is None else cap
+    previous = load_feed_items(feed_path, date_key)
+
+    new = changed = 0
+    for item in items:
+        old = previous.pop(item["link"], None)
+        if old is None:
+            new += 1
+        elif any(old.get(field) != item.get(field) for field in COMPARED_FIELDS if field in item):
+            changed += 1
+
+    # The oldest items fall off the history first, undated ones before any dated one
+    newest = sorted(previous, key=lambda link: _timestamp(previous[link][date_key]), reverse=True)
+    kept = set(newest[: max(cap - len(items), 0)])
+    # feedgen prepends entries, so the feed lists them in reverse; undo that to keep the file stable
+    retained = [item for link, item in reversed(previous.items()) if link in kept]
+
+    logger.info(
+        f"Merged feed {Path(feed_path).name}: {new} new, {changed} changed, "
+        f"{len(items) - new - changed} unchanged, {len(retained)} kept from history, "
+        f"{len(previous) - len(retained)} dropped over the cap of {cap}"
+    )
+    return list(items) + retained
+
+
+def _timestamp(date):
+    return date.timestamp() if date else float("-inf")
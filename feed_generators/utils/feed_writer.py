@@ -0,0 +1,293 @@
+import gzip
+import hashlib
+import io
+import json
+import logging
+import os
+import tempfile
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+from utils.metrics import count
+
+logger = logging.getLogger(__name__)
+
+ATOM_ENTRY_TAG = "{http://www.w3.org/2005/Atom}entry"
+JSON_FEED_VERSION = "https://jsonfeed.org/version/1.1"
+
+# Closing tags of the (entry-less) feed document, and the nesting level of its entries
+FEED_FORMATS = {
+    "rss": ("  </channel>\n</rss>\n", 2),
+    "atom": ("</feed>\n", 1),
+}
+
+
+def _gzip(data):
+    # mtime=0 keeps the output byte-stable, so an unchanged feed gives an unchanged .gz
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def _brotli(data):
+    import brotli
+
+    return brotli.compress(data, quality=11)
+
+
+# Precompressed siblings written next to every feed (feed_x.xml.gz, ...), so the web tier serves them as is
+COMPRESSORS = {".gz": _gzip, ".br": _brotli}
+
+
+def item_fingerprint(feed_xml):
+    """Return a canonical fingerprint of the items of an RSS (or Atom) document.
+
+    Covers every element of every channel/item (or entry), in order, with its attributes and
+    stripped text; channel-level metadata such as lastBuildDate is ignored. `feed_xml` is the
+    document as bytes or a path; it is parsed incrementally, so large feeds stay cheap to hash.
+    """
+    source = io.BytesIO(feed_xml) if isinstance(feed_xml, bytes) else str(feed_xml)
+    digest = hashlib.sha256()
+    for _, element in ET.iterparse(source):
+        if element.tag in ("item", ATOM_ENTRY_TAG):
+            fields = [[child.tag, sorted(child.attrib.items()), (child.text or "").strip()] for child in element]
+            digest.update(json.dumps(fields, ensure_ascii=False).encode("utf-8"))
+            element.clear()
+    return digest.hexdigest()
+
+
+def json_item_fingerprint(feed_json):
+    """Return a canonical fingerprint of the items of a JSON Feed document, given as bytes or a path."""
+    document = json.loads(feed_json if isinstance(feed_json, bytes) else Path(feed_json).read_bytes())
+    return hashlib.sha256(json.dumps(document["items"], sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def compressed_path(output_path, suffix):
+    """Return the path of a precompressed sibling of a feed, e.g. feed_x.xml.gz."""
+    return output_path.with_name(output_path.name + suffix)
+
+
+def _sync(f):
+    """Flush a file to disk, so it is complete before it is renamed into place."""
+    f.flush()
+    os.fsync(f.fileno())
+
+
+def _publish(temp_path, output_path):
+    """Rename a synced temporary file into place and sync the directory, so the rename survives a crash."""
+    # mkstemp creates the file owner-only; published feeds are world-readable
+    os.chmod(temp_path, 0o644)
+    os.replace(temp_path, output_path)
+    dir_fd = os.open(output_path.parent, os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+
+
+def _write_atomic(output_path, data):
+    """Write bytes to a temporary file beside `output_path`, sync it and rename it into place."""
+    fd, temp_path = tempfile.mkstemp(dir=output_path.parent, prefix=f".{output_path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            _sync(f)
+        _publish(temp_path, output_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+
+
+def write_compressed(output_path, data=None, stale_only=False):
+    """Write the precompressed siblings of a feed (see COMPRESSORS), compressed once at build time.
+
+    With `stale_only`, siblings that exist and are newer than the feed are left alone, so
+    an unchanged feed still gets siblings it is missing.
+    """
+    for suffix, compress in COMPRESSORS.items():
+        path = compressed_path(output_path, suffix)
+        if stale_only and path.exists() and path.stat().st_mtime >= output_path.stat().st_mtime:
+            continue
+        if data is None:
+            data = output_path.read_bytes()
+        compressed = compress(data)
+        _write_atomic(path, compressed)
+        count("bytes_compressed", len(compressed))
+
+
+def _replace_if_changed(temp_path, output_path, fingerprint=item_fingerprint):
+    """Move a freshly written feed into place, unless the existing file has the same items."""
+    if output_path.exists():
+        try:
+            unchanged = fingerprint(output_path) == fingerprint(temp_path)
+        except (ET.ParseError, ValueError, KeyError) as e:
+            logger.warning(f"Existing feed {output_path} is not valid, overwriting it: {str(e)}")
+            unchanged = False
+        if unchanged:
+            os.unlink(temp_path)
+            write_compressed(output_path, stale_only=True)
+            return False
+    _publish(temp_path, output_path)
+    count("bytes_written", output_path.stat().st_size)
+    write_compressed(output_path)
+    return True
+
+
+def write_feed(feed_generator, output_path, feed_format="rss"):
+    """Write a FeedGenerator as pretty RSS (or Atom), unless the existing file has the same items.
+
+    The file is replaced atomically and its precompressed siblings rewritten (see write_compressed).
+    Returns True if the file was written and False if it was left untouched.
+    """
+    output_path = Path(output_path)
+    rss_xml = (feed_generator.atom_str if feed_format == "atom" else feed_generator.rss_str)(pretty=True)
+
+    if output_path.exists():
+        try:
+            unchanged = item_fingerprint(output_path.read_bytes()) == item_fingerprint(rss_xml)
+        except ET.ParseError as e:
+            logger.warning(f"Existing feed {output_path} is not valid XML, overwriting it: {str(e)}")
+            unchanged = False
+        if unchanged:
+            write_compressed(output_path, stale_only=True)
+            return False
+
+    _write_atomic(output_path, rss_xml)
+    count("bytes_written", len(rss_xml))
+    write_compressed(output_path, rss_xml)
+    return True
+
+
+def _apply_entry(fe, entry):
+    """Set the fields of an entry dict on a feedgen FeedEntry."""
+    fe.title(entry["title"])
+    fe.link(href=entry["link"])
+    if entry.get("description") is not None:
+        fe.description(entry["description"])
+    if entry.get("published") is not None:
+        fe.published(entry["published"])
+        # Atom requires <updated>; RSS output ignores it
+        fe.updated(entry["published"])
+    if entry.get("updated") is not None:
+        fe.updated(entry["updated"])
+    if entry.get("category") is not None:
+        fe.category(term=entry["category"])
+    if entry.get("id") is not None:
+        fe.id(entry["id"])
+
+
+def add_entry(feed_generator, entry):
+    """Add an entry dict (see stream_feed) to a FeedGenerator."""
+    _apply_entry(feed_generator.add_entry(), entry)
+
+
+def _entry_element(entry, feed_format):
+    """Build the lxml element of one entry dict, exactly as feedgen would render it."""
+    from feedgen.entry import FeedEntry
+
+    fe = FeedEntry()
+    _apply_entry(fe, entry)
+    if feed_format == "atom" and entry.get("id") is None:
+        fe.id(entry["link"])
+    return fe.atom_entry() if feed_format == "atom" else fe.rss_entry()
+
+
+def stream_feed(feed_generator, entries, output_path, feed_format="rss"):
+    """Stream a feed to `output_path` one entry at a time, unless the existing file has the same items.
+
+    `feed_generator` carries the channel metadata only; `entries` is an iterable of dicts with
+    title and link, and optionally description, published, category and id, written in the
+    order given. Only one entry's XML element is built at a time, instead of feedgen's entry
+    objects and element tree for the whole feed; the entry dicts themselves are the caller's.
+    The feed is written to a temporary file beside `output_path`, synced and renamed into place,
+    so readers never see a partial file.
+    Produces the same bytes as feedgen's pretty output would for the same entries.
+
+    Returns True if the file was written and False if it was left untouched.
+    """
+    from lxml import etree
+
+    output_path = Path(output_path)
+    closing, level = FEED_FORMATS[feed_format]
+    header = (feed_generator.atom_str if feed_format == "atom" else feed_generator.rss_str)(pretty=True).decode("utf-8")
+    if not header.endswith(closing):
+        raise ValueError(f"Feed generator already has entries or an unexpected {feed_format} layout")
+
+    fd, temp_path = tempfile.mkstemp(dir=output_path.parent, prefix=f".{output_path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(header[: -len(closing)])
+            for entry in entries:
+                element = _entry_element(entry, feed_format)
+                etree.indent(element, level=level)
+                f.write("  " * level)
+                f.write(etree.tostring(element, encoding="unicode"))
+                f.write("\n")
+            f.write(closing)
+            _sync(f)
+        return _replace_if_changed(temp_path, output_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+
+
+def _json_feed_header(feed_generator):
+    """Return the top-level fields of a JSON Feed for the channel metadata of a FeedGenerator."""
+    header = {"version": JSON_FEED_VERSION, "title": feed_generator.title()}
+    links = feed_generator.link() or []
+    home_page = next((link["href"] for link in links if link.get("rel", "alternate") == "alternate"), None)
+    optional = {
+        "home_page_url": home_page,
+        "description": feed_generator.description(),
+        "icon": feed_generator.logo(),
+        "language": feed_generator.language(),
+        "authors": [{"name": author["name"]} for author in feed_generator.author() or [] if author.get("name")],
+    }
+    header.update((key, value) for key, value in optional.items() if value)
+    return header
+
+
+def _json_item(entry):
+    """Return the JSON Feed item of an entry dict (see stream_feed)."""
+    item = {
+        "id": entry.get("id") or entry["link"],
+        "url": entry["link"],
+        "title": entry["title"],
+        # JSON Feed items need content_html or content_text
+        "content_html": entry.get("description") or "",
+    }
+    if entry.get("published") is not None:
+        item["date_published"] = entry["published"].isoformat()
+    if entry.get("updated") is not None:
+        item["date_modified"] = entry["updated"].isoformat()
+    if entry.get("category") is not None:
+        item["tags"] = [entry["category"]]
+    return item
+
+
+def write_json_feed(feed_generator, entries, output_path):
+    """Write a JSON Feed 1.1 document one item per line, unless the existing file has the same items.
+
+    `feed_generator` supplies the channel metadata and `entries` the items (dicts as for
+    stream_feed), written in the order given, one at a time and atomically as stream_feed does.
+
+    Returns True if the file was written and False if it was left untouched.
+    """
+    output_path = Path(output_path)
+    # The header without its closing brace, so the items can be appended as they come
+    header = json.dumps(_json_feed_header(feed_generator), indent=2, ensure_ascii=False)[: -len("\n}")]
+
+    fd, temp_path = tempfile.mkstemp(dir=output_path.parent, prefix=f".{output_path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(header + ',\n  "items": [')
+            for index, entry in enumerate(entries):
+                f.write(",\n    " if index else "\n    ")
+                f.write(json.dumps(_json_item(entry), ensure_ascii=False))
+            f.write("\n  ]\n}\n")
+            _sync(f)
+        return _replace_if_changed(temp_path, output_path, fingerprint=json_item_fingerprint)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
@@ -0,0 +1,164 @@
+import atexit
+import logging
+import threading
+from dataclasses import dataclass
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/91.0.4472.124 Safari/537.36"
+)
+DEFAULT_TIMEOUT = 10
+# Connections kept alive per host; enough for the concurrent essay fetches in paulgraham_blog
+POOL_MAXSIZE = 8
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+class FetchError(OSError):
+    """A request that failed: connection error, timeout or 4xx/5xx response.
+
+    Raised instead of requests' exceptions, chained to them, so callers can catch it without
+    importing requests.
+    """
+
+
+@dataclass
+class FetchStats:
+    """Transfer statistics of one source's requests."""
+
+    requests: int = 0
+    bytes_transferred: int = 0
+    new_connections: int = 0
+    ttfb_total: float = 0.0
+    ttfb_max: float = 0.0
+
+    @property
+    def connection_reuse_rate(self):
+        return 1 - self.new_connections / self.requests if self.requests else 0.0
+
+    @property
+    def ttfb_avg(self):
+        return self.ttfb_total / self.requests if self.requests else 0.0
+
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def get_session(url):
+    """Return the pooled keep-alive Session for the scheme and host of `url`."""
+    parts = urlsplit(url)
+    key = f"{parts.scheme}://{parts.netloc}"
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None:
+            # Imported on first use, so importing this module (e.g. for its stats) stays cheap
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util import make_headers
+
+            session = requests.Session()
+            session.headers["User-Agent"] = USER_AGENT
+            # Advertises br only when the brotli package is installed, since urllib3 can't decode it otherwise
+            session.headers["Accept-Encoding"] = make_headers(accept_encoding=True)["accept-encoding"]
+            session.mount(f"{key}/", HTTPAdapter(pool_connections=1, pool_maxsize=POOL_MAXSIZE))
+            _sessions[key] = session
+        return session
+
+
+def _connections_opened(session, url):
+    """Return how many connections the session has opened to the host of `url` so far."""
+    host = urlsplit(url).hostname
+    try:
+        pools = session.get_adapter(url).poolmanager.pools
+        return sum(pools[key].num_connections for key in pools.keys() if key.key_host == host)
+    except Exception:
+        return 0
+
+
+def _stats_for(url, source):
+    """Return the FetchStats of a source (or of the host of `url`); call with _stats_lock held."""
+    return _stats.setdefault(source or urlsplit(url).netloc, FetchStats())
+
+
+def fetch(url, source=None, headers=None, timeout=DEFAULT_TIMEOUT, stream=False):
+    """GET a URL through the shared session for its host and record transfer stats.
+
+    With stream=True the body is left unread: read it incrementally (e.g. response.iter_lines())
+    and hand the response to finish_stream, which closes it and counts the bytes read.
+
+    Raises FetchError if the request fails, including for 4xx/5xx responses, like response.raise_for_status().
+    """
+    session = get_session(url)
+    # Loaded by get_session already
+    from requests import RequestException
+
+    connections_before = _connections_opened(session, url)
+
+    try:
+        response = session.get(url, headers=headers, timeout=timeout, stream=stream)
+    except RequestException as e:
+        raise FetchError(str(e)) from e
+
+    # Under concurrency another thread may open a connection in between; the count is approximate
+    new_connections = _connections_opened(session, url) - connections_before
+    # raw.tell() counts the bytes read off the wire, i.e. before decompression
+    bytes_transferred = 0 if stream else response.raw.tell() or len(response.content)
+    ttfb = response.elapsed.total_seconds()
+
+    with _stats_lock:
+        stats = _stats_for(url, source)
+        stats.requests += 1
+        stats.bytes_transferred += bytes_transferred
+        stats.new_connections += new_connections
+        stats.ttfb_total += ttfb
+        stats.ttfb_max = max(stats.ttfb_max, ttfb)
+
+    if stream and not response.ok:
+        response.close()
+    try:
+        response.raise_for_status()
+    except RequestException as e:
+        raise FetchError(str(e)) from e
+    return response
+
+
+def finish_stream(response, source=None):
+    """Close a response fetched with stream=True, counting the bytes of its body read so far."""
+    bytes_transferred = response.raw.tell()
+    response.close()
+    url = response.history[0].url if response.history else response.url
+    with _stats_lock:
+        _stats_for(url, source).bytes_transferred += bytes_transferred
+
+
+def get_fetch_stats():
+    """Return a snapshot of the transfer stats of every source, keyed by source name."""
+    with _stats_lock:
+        return {
+            source: {
+                "requests": stats.requests,
+                "bytes_transferred": stats.bytes_transferred,
+                "connection_reuse_rate": round(stats.connection_reuse_rate, 3),
+                "ttfb_avg": round(stats.ttfb_avg, 3),
+                "ttfb_max": round(stats.ttfb_max, 3),
+            }
+            for source, stats in _stats.items()
+        }
+
+
+def log_fetch_stats():
+    """Log the transfer stats of every source fetched in this process."""
+    for source, stats in get_fetch_stats().items():
+        logger.info(
+            f"Fetch stats for {source}: {stats['requests']} requests, {stats['bytes_transferred']} bytes, "
+            f"{stats['connection_reuse_rate']:.0%} connection reuse, "
+            f"TTFB avg {stats['ttfb_avg'] * 1000:.0f}ms / max {stats['ttfb_max'] * 1000:.0f}ms"
+        )
+
+
+atexit.register(log_fetch_stats)
@@ -0,0 +1,73 @@
+import logging
+import threading
+from pathlib import Path
+
+from utils.fetch import DEFAULT_TIMEOUT, fetch
+from utils.store import PROJECT_ROOT, get_validator, save_validator
+
+logger = logging.getLogger(__name__)
+
+# Validators seen in this process, waiting for the feed built from that response to be saved. Keyed by
+# (source, url), since sources fetching the same URL (anthropic and anthropic_news) each need their own
+_pending = {}
+_lock = threading.Lock()
+
+
+def conditional_headers(url, source=None):
+    """Return If-None-Match / If-Modified-Since headers for a source's URL, if it has usable validators.
+
+    Validators are only usable while the feed that was built from that response still exists,
+    otherwise a deleted feed would never be regenerated.
+    """
+    try:
+        entry = get_validator(source or "", url)
+    except Exception as e:
+        logger.warning(f"Failed to load HTTP validators of {url}: {e}")
+        return {}
+    if not entry or not entry.get("output") or not (PROJECT_ROOT / entry["output"]).exists():
+        return {}
+    headers = {}
+    if entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+def conditional_get(url, source=None, timeout=DEFAULT_TIMEOUT, stream=False):
+    """GET a URL with the stored validators, through the shared session (see utils.fetch).
+
+    Returns the response, or None if the server answered 304 Not Modified. Validators from a
+    200 response are only persisted once `commit_validators` is called for the source and URL. With
+    stream=True the body is left unread, as with utils.fetch.fetch.
+    """
+    response = fetch(url, source=source, headers=conditional_headers(url, source), timeout=timeout, stream=stream)
+    if response.status_code == 304:
+        logger.info(f"Not modified since last run: {url}")
+        response.close()
+        return None
+
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    if etag or last_modified:
+        with _lock:
+            _pending[(source or "", url)] = {"etag": etag, "last_modified": last_modified}
+    return response
+
+
+def commit_validators(url, output_path, source=None):
+    """Persist the validators of the source's last response for `url` now that `output_path` is saved."""
+    with _lock:
+        entry = _pending.pop((source or "", url), None)
+    if entry is None:
+        return
+    # Stored relative to the project root, since the cache is committed alongside the feeds
+    output_path = Path(output_path).resolve()
+    if output_path.is_relative_to(PROJECT_ROOT):
+        output_path = output_path.relative_to(PROJECT_ROOT)
+    entry["output"] = str(output_path)
+
+    try:
+        save_validator(source or "", url, entry)
+    except Exception as e:
+        logger.warning(f"Failed to save HTTP validators of {url}: {e}")
@@ -0,0 +1,152 @@
+import contextvars
+import fcntl
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from utils.fetch import get_fetch_stats
+
+logger = logging.getLogger(__name__)
+
+# Append each run's metrics record to this JSON Lines file, in addition to logging it
+METRICS_FILE_ENV = "RSS_FEEDS_METRICS_FILE"
+
+_current_run = contextvars.ContextVar("current_run", default=None)
+
+
+class RunMetrics:
+    """Timings and counters of one generator run.
+
+    CPU time is per thread (time.thread_time), so sources run concurrently by run_all_feeds
+    don't count each other's work. Worker threads count toward the run when their function is
+    wrapped with bind_run; CPU spent in other processes (Chrome) is not counted.
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self.started_at = datetime.now(timezone.utc)
+        self.stages = {}
+        self.counters = {"items": 0, "bytes_rendered": 0, "bytes_written": 0, "bytes_compressed": 0}
+        self.status = None
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.thread_time()
+        self._worker_cpu = 0.0
+        self._worker_cpu_lock = threading.Lock()
+        self._fetched_before = self._fetched_bytes()
+
+    def _fetched_bytes(self):
+        # Taken from utils.fetch's per-source stats, so requests made on worker threads count too
+        return get_fetch_stats().get(self.source, {}).get("bytes_transferred", 0)
+
+    def add_worker_cpu(self, seconds):
+        with self._worker_cpu_lock:
+            self._worker_cpu += seconds
+
+    @contextmanager
+    def stage(self, name):
+        wall_start, cpu_start, worker_start = time.perf_counter(), time.thread_time(), self._worker_cpu
+        try:
+            yield
+        finally:
+            timing = self.stages.setdefault(name, {"wall_time": 0.0, "cpu_time": 0.0})
+            timing["wall_time"] += time.perf_counter() - wall_start
+            # Worker threads started by the stage have finished by the time it ends
+            timing["cpu_time"] += time.thread_time() - cpu_start + self._worker_cpu - worker_start
+
+    def record(self):
+        """Return the run's metrics as a JSON-serializable dict."""
+        return {
+            "source": self.source,
+            "started_at": self.started_at.isoformat(),
+            "status": self.status,
+            "wall_time": round(time.perf_counter() - self._wall_start, 4),
+            "cpu_time": round(time.thread_time() - self._cpu_start + self._worker_cpu, 4),
+            "stages": {
+                name: {key: round(value, 4) for key, value in timing.items()} for name, timing in self.stages.items()
+            },
+            "bytes_fetched": self._fetched_bytes() - self._fetched_before,
+            **self.counters,
+        }
+
+
+def stage(name):
+    """Time a stage (fetch, parse, generate, save, ...) of the current generator run.
+
+    A no-op context manager when called outside an instrumented run.
+    """
+    run = _current_run.get()
+    return run.stage(name) if run else _null_stage()
+
+
+@contextmanager
+def _null_stage():
+    yield
+
+
+def bind_run(func):
+    """Wrap `func` to run on a worker thread as part of the current generator run.
+
+    Thread pools don't inherit the run, so without this the worker's CPU time and counters
+    are lost. Returns `func` unchanged when called outside an instrumented run.
+    """
+    run = _current_run.get()
+    if run is None:
+        return func
+
+    def bound(*args, **kwargs):
+        token = _current_run.set(run)
+        cpu_start = time.thread_time()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            run.add_worker_cpu(time.thread_time() - cpu_start)
+            _current_run.reset(token)
+
+    return bound
+
+
+def count(counter, amount):
+    """Add to a counter (items, bytes_rendered, bytes_written, bytes_compressed) of the current run."""
+    run = _current_run.get()
+    if run:
+        run.counters[counter] += amount
+
+
+def emit(record):
+    """Log a run's metrics record and append it to RSS_FEEDS_METRICS_FILE, if set."""
+    line = json.dumps(record, sort_keys=True)
+    logger.info(f"Run metrics: {line}")
+    metrics_file = os.environ.get(METRICS_FILE_ENV)
+    if not metrics_file:
+        return
+    try:
+        # Generators run concurrently, so append under an exclusive lock
+        with open(metrics_file, "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.write(line + "\n")
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+    except Exception as e:
+        logger.warning(f"Failed to write run metrics to {metrics_file}: {e}")
+
+
+@contextmanager
+def track_run(source):
+    """Collect the metrics of one generator run and emit them when it ends.
+
+    Yields the RunMetrics; set its status before leaving the block, otherwise the run is
+    recorded as "failed".
+    """
+    run = RunMetrics(source)
+    token = _current_run.set(run)
+    try:
+        yield run
+    finally:
+        _current_run.reset(token)
+        run.status = run.status or "failed"
+        emit(run.record())
@@ -0,0 +1,46 @@
+import re
+import threading
+
+
+class Strainer:
+    """A SoupStrainer built on first use, so declaring one doesn't import bs4.
+
+    Takes the same arguments as bs4.SoupStrainer. Generators declare theirs at module level;
+    bs4 is only imported once a page is actually parsed.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        self._strainer = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        with self._lock:
+            if self._strainer is None:
+                from bs4 import SoupStrainer
+
+                self._strainer = SoupStrainer(*self.args, **self.kwargs)
+            return self._strainer
+
+
+def make_soup(markup, only=None, parser="lxml"):
+    """Parse HTML, with the lxml backend unless `parser` names another.
+
+    `only` is an optional Strainer (or SoupStrainer); when given, only the matching elements
+    (and their descendants) are built into the tree, so selectors must not rely on their ancestors.
+    """
+    from bs4 import BeautifulSoup
+
+    if isinstance(only, Strainer):
+        only = only.get()
+    return BeautifulSoup(markup, parser, parse_only=only)
+
+
+def has_class(class_name):
+    """Match one class of a (possibly multi-valued) class attribute in a SoupStrainer.
+
+    While parsing, SoupStrainer sees the raw attribute string, so a plain class_="x" only
+    matches elements whose sole class is x.
+    """
+    return re.compile(rf"(?:^|\s){re.escape(class_name)}(?:\s|$)")
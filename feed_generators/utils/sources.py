@@ -0,0 +1,191 @@
+import logging
+from datetime import datetime, timezone
+
+from utils.feed_merge import merge_enabled, merge_feed_items
+from utils.feed_writer import add_entry, stream_feed, write_feed, write_json_feed
+from utils.http_cache import commit_validators
+from utils.metrics import count, stage, track_run
+from utils.store import FEEDS_DIR
+
+# Every FeedSource subclass declared with @register, keyed by feed name
+SOURCES = {}
+
+
+def register(source_class):
+    """Class decorator adding a FeedSource subclass to the registry run by run_all_feeds."""
+    SOURCES[source_class.name] = source_class
+    return source_class
+
+
+def ensure_feeds_directory():
+    """Ensure the feeds directory exists."""
+    FEEDS_DIR.mkdir(exist_ok=True)
+    return FEEDS_DIR
+
+
+def newest_first(items, date_key="date"):
+    """Sort items by date, newest first; undated items keep their order and go last."""
+    dated = sorted((item for item in items if item[date_key] is not None), key=lambda x: x[date_key], reverse=True)
+    return dated + [item for item in items if item[date_key] is None]
+
+
+class FeedSource:
+    """A website turned into a feed: fetch, parse, (merge,) generate and save.
+
+    Subclasses set the class attributes below and implement fetch, parse and configure_feed;
+    entry maps a parsed item to the fields of its feed entry. The entries are built once per
+    run and saved as RSS, Atom and JSON Feed.
+    """
+
+    # The feed is saved to feeds/feed_{name}.xml (.atom, .json); also names the source in fetch stats and metrics
+    name = None
+    url = None
+    # Scheduled on the runner's browser pool, so browser-backed sources share one Chrome
+    uses_browser = False
+    # Stream entries to disk one at a time (see utils.feed_writer.stream_feed), for large feeds
+    stream = False
+    # Seconds between runs in daemon mode (run_all_feeds.py --daemon)
+    interval = 60 * 60
+    # Whether merge mode (utils.feed_merge) keeps the items the page no longer lists
+    mergeable = True
+    # Add entries newest first, instead of in the order the page lists them
+    sort_by_date = False
+    date_key = "date"
+
+    def __init__(self, name=None):
+        if name:
+            self.name = name
+        self.logger = logging.getLogger(type(self).__module__)
+
+    @property
+    def feed_path(self):
+        return ensure_feeds_directory() / f"feed_{self.name}.xml"
+
+    @property
+    def atom_path(self):
+        return self.feed_path.with_suffix(".atom")
+
+    @property
+    def json_path(self):
+        return self.feed_path.with_suffix(".json")
+
+    def fetch(self):
+        """Return the page content, or None if it has not changed since the last run."""
+        raise NotImplementedError
+
+    def parse(self, content):
+        """Return the items of the page content as dicts."""
+        raise NotImplementedError
+
+    def configure_feed(self, fg):
+        """Set the channel metadata of the feed."""
+        raise NotImplementedError
+
+    def entry(self, item):
+        """Return the entry fields of an item (see utils.feed_writer.stream_feed)."""
+        return {
+            "title": item["title"],
+            "link": item["link"],
+            "description": item["description"],
+            "published": item[self.date_key],
+            "category": item.get("category"),
+            "id": item["link"],
+        }
+
+    def fetch_items(self):
+        """Fetch and parse the page; returns None if it has not changed since the last run."""
+        with stage("fetch"):
+            content = self.fetch()
+        if content is None:
+            return None
+        with stage("parse"):
+            return self.parse(content)
+
+    def feed_entries(self, items):
+        """Return the entries of the items, the one model every output format is rendered from."""
+        entries = [self.entry(item) for item in items]
+        # Atom requires a date on every entry: undated ones take the newest date of the feed
+        dates = [entry["published"] for entry in entries if entry.get("published") is not None]
+        fallback = max(dates) if dates else datetime.now(timezone.utc)
+        for entry in entries:
+            if entry.get("published") is None:
+                entry["updated"] = fallback
+        return entries
+
+    def generate_feed(self, entries):
+        """Generate the feed; streamed sources get the channel only, save_feeds adds the entries."""
+        from feedgen.feed import FeedGenerator
+
+        fg = FeedGenerator()
+        self.configure_feed(fg)
+        if not fg.id():
+            # Required by Atom, ignored by RSS
+            alternate = [link["href"] for link in fg.link() or [] if link.get("rel", "alternate") == "alternate"]
+            fg.id(alternate[0] if alternate else self.url)
+        if not self.stream:
+            for entry in entries:
+                add_entry(fg, entry)
+        self.logger.info("Successfully generated feed")
+        return fg
+
+    def save_feeds(self, feed_generator, entries):
+        """Save the feed as RSS, Atom and JSON Feed; returns whether any file was written."""
+        # Entries in document order: feedgen's add_entry prepends, so the others follow it.
+        # Iterated in reverse rather than copied; each writer takes its own iterator
+        if self.stream:
+            rss_written = stream_feed(feed_generator, reversed(entries), self.feed_path)
+            atom_written = stream_feed(feed_generator, reversed(entries), self.atom_path, feed_format="atom")
+        else:
+            rss_written = write_feed(feed_generator, self.feed_path)
+            atom_written = write_feed(feed_generator, self.atom_path, feed_format="atom")
+        json_written = write_json_feed(feed_generator, reversed(entries), self.json_path)
+
+        saved = {self.feed_path: rss_written, self.atom_path: atom_written, self.json_path: json_written}
+        for path, written in saved.items():
+            if written:
+                self.logger.info(f"Successfully saved feed to {path}")
+            else:
+                self.logger.info(f"Feed unchanged, skipped writing {path}")
+        return any(saved.values())
+
+    def _run(self):
+        try:
+            items = self.fetch_items()
+            if items is None:
+                self.logger.info(f"{self.url} unchanged since the last run, skipping feed generation")
+                return "not_modified"
+            count("items", len(items))
+            if not items:
+                self.logger.warning(f"No items found at {self.url}")
+                return "failed"
+
+            # In merge mode, keep the items of the existing feed that are no longer listed
+            if self.mergeable and merge_enabled():
+                with stage("merge"):
+                    items = merge_feed_items(items, self.feed_path, date_key=self.date_key)
+            if self.sort_by_date:
+                items = newest_first(items, self.date_key)
+
+            with stage("generate"):
+                entries = self.feed_entries(items)
+                feed = self.generate_feed(entries)
+            with stage("save"):
+                written = self.save_feeds(feed, entries)
+            commit_validators(self.url, self.feed_path, source=self.name)
+
+            self.logger.info(f"Successfully generated RSS feed with {len(items)} items")
+            return "ok" if written else "unchanged"
+
+        except Exception as e:
+            self.logger.error(f"Failed to generate RSS feed: {str(e)}")
+            return "failed"
+
+    def run(self):
+        """Generate and save the feed, emitting the run's metrics.
+
+        Returns the status: "ok", "unchanged" (same items as the saved feed, file untouched),
+        "not_modified" (source unchanged since the last run) or "failed".
+        """
+        with track_run(self.name) as metrics:
+            metrics.status = self._run()
+        return metrics.status
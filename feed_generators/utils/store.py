@@ -0,0 +1,233 @@
+import json
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+FEEDS_DIR = PROJECT_ROOT / "feeds"
+# Committed alongside the feeds, so it uses the default rollback journal: WAL would leave
+# recent writes in a -wal file next to it
+STORE_FILE = FEEDS_DIR / "feeds_store.sqlite3"
+# Seconds a writer waits for another connection's transaction before giving up
+BUSY_TIMEOUT = 30
+
+SCHEMA_VERSION = 1
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS first_seen (
+    source TEXT NOT NULL,
+    key TEXT NOT NULL,
+    title TEXT,
+    first_seen TEXT NOT NULL,
+    PRIMARY KEY (source, key)
+);
+CREATE TABLE IF NOT EXISTS item_fingerprints (
+    source TEXT NOT NULL,
+    key TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    description TEXT,
+    published TEXT,
+    fetched_at TEXT NOT NULL,
+    PRIMARY KEY (source, key)
+);
+CREATE INDEX IF NOT EXISTS item_fingerprints_fetched_at ON item_fingerprints (source, fetched_at);
+CREATE TABLE IF NOT EXISTS http_validators (
+    source TEXT NOT NULL,
+    url TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    output TEXT,
+    PRIMARY KEY (source, url)
+);
+"""
+
+# The JSON caches the store replaces: file name -> source of their first_seen rows, imported once by _migrate
+LEGACY_FILES = {
+    "anthropic_engineering_article_cache.json": "anthropic_engineering",
+}
+
+_initialized = False
+_init_lock = threading.Lock()
+
+
+def _format_date(date):
+    return date.isoformat() if date else None
+
+
+def _parse_date(text):
+    return datetime.fromisoformat(text) if text else None
+
+
+def _migrate(conn):
+    """Import the legacy JSON caches; returns the files imported, to be deleted once committed."""
+    migrated = []
+    for file_name, source in LEGACY_FILES.items():
+        legacy_file = FEEDS_DIR / file_name
+        if not legacy_file.exists():
+            continue
+        try:
+            # Articles map to {"title", "date"}
+            with open(legacy_file, "r") as f:
+                rows = [(source, link, value["title"], value["date"]) for link, value in json.load(f).items()]
+        except Exception as e:
+            logger.warning(f"Failed to migrate {legacy_file}, leaving it in place: {e}")
+            continue
+        conn.executemany("INSERT OR IGNORE INTO first_seen VALUES (?, ?, ?, ?)", rows)
+        logger.info(f"Migrated {len(rows)} entries from {legacy_file} to {STORE_FILE}")
+        migrated.append(legacy_file)
+    return migrated
+
+
+def _connect():
+    """Open a connection to the store in autocommit mode, so transactions are only the explicit BEGINs."""
+    # Imported on first use, so importing this module (as every generator does) stays cheap
+    import sqlite3
+
+    return sqlite3.connect(STORE_FILE, timeout=BUSY_TIMEOUT, isolation_level=None)
+
+
+def _initialize():
+    """Create the schema and run the one-time migration, once per process."""
+    global _initialized
+    with _init_lock:
+        if _initialized:
+            return
+        FEEDS_DIR.mkdir(exist_ok=True)
+        conn = _connect()
+        migrated = []
+        try:
+            # Exclusive, so concurrent processes can't both see an unmigrated store
+            conn.execute("BEGIN EXCLUSIVE")
+            if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+                # executescript would commit first, so run the statements one by one
+                for statement in SCHEMA.split(";"):
+                    if statement.strip():
+                        conn.execute(statement)
+                migrated = _migrate(conn)
+                conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        for legacy_file in migrated:
+            legacy_file.unlink()
+        _initialized = True
+
+
+@contextmanager
+def transaction():
+    """Yield a connection inside a write transaction, committed on success and rolled back on error.
+
+    BEGIN IMMEDIATE takes the write lock up front, so concurrent writers (threads or processes)
+    queue on the busy timeout instead of failing to upgrade a read lock.
+    """
+    _initialize()
+    conn = _connect()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+    finally:
+        conn.close()
+
+
+@contextmanager
+def reader():
+    """Yield a connection for reads."""
+    _initialize()
+    conn = _connect()
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+def load_first_seen(source):
+    """Return {key: (title, first-seen datetime)} of a source."""
+    with reader() as conn:
+        rows = conn.execute("SELECT key, title, first_seen FROM first_seen WHERE source = ?", (source,))
+        return {key: (title, _parse_date(seen)) for key, title, seen in rows}
+
+
+def record_first_seen(source, entries):
+    """Record {key: (title, first-seen datetime)} for a source; keys already recorded keep their date."""
+    with transaction() as conn:
+        conn.executemany(
+            "INSERT INTO first_seen VALUES (?, ?, ?, ?) ON CONFLICT (source, key) DO NOTHING",
+            [(source, key, title, _format_date(seen)) for key, (title, seen) in entries.items()],
+        )
+
+
+def load_item_fingerprints(source):
+    """Return {key: {"fingerprint", "description", "published", "fetched_at"}} of a source."""
+    with reader() as conn:
+        rows = conn.execute(
+            "SELECT key, fingerprint, description, published, fetched_at FROM item_fingerprints WHERE source = ?",
+            (source,),
+        )
+        return {
+            key: {
+                "fingerprint": fingerprint,
+                "description": description,
+                "published": _parse_date(published),
+                "fetched_at": _parse_date(fetched_at),
+            }
+            for key, fingerprint, description, published, fetched_at in rows
+        }
+
+
+def save_item_fingerprints(source, entries):
+    """Insert or update {key: {"fingerprint", "description", "published", "fetched_at"}} for a source."""
+    with transaction() as conn:
+        conn.executemany(
+            """
+            INSERT INTO item_fingerprints VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (source, key) DO UPDATE SET
+                fingerprint = excluded.fingerprint,
+                description = excluded.description,
+                published = excluded.published,
+                fetched_at = excluded.fetched_at
+            """,
+            [
+                (
+                    source,
+                    key,
+                    entry["fingerprint"],
+                    entry["description"],
+                    _format_date(entry["published"]),
+                    _format_date(entry["fetched_at"]),
+                )
+                for key, entry in entries.items()
+            ],
+        )
+
+
+def get_validator(source, url):
+    """Return the stored {"etag", "last_modified", "output"} of a source's URL, or None."""
+    with reader() as conn:
+        row = conn.execute(
+            "SELECT etag, last_modified, output FROM http_validators WHERE source = ? AND url = ?", (source, url)
+        ).fetchone()
+    return dict(zip(("etag", "last_modified", "output"), row)) if row else None
+
+
+def save_validator(source, url, entry):
+    """Insert or update the {"etag", "last_modified", "output"} of a source's URL."""
+    with transaction() as conn:
+        conn.execute(
+            """
+            INSERT INTO http_validators VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (source, url) DO UPDATE SET
+                etag = excluded.etag, last_modified = excluded.last_modified, output = excluded.output
+            """,
+            (source, url, entry.get("etag"), entry.get("last_modified"), entry.get("output")),
+        )